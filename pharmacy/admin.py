@@ -1,3 +1,169 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 
-# Register your models here.
+from .models import (
+    Batch,
+    Customer,
+    GoodsReceipt,
+    GoodsReceiptDetail,
+    Inventory,
+    Product,
+    PurchaseOrder,
+    PurchaseOrderDetail,
+    Sale,
+    SALE_DETAIL_LIST_FIELDS,
+    SaleDetail,
+    StockMovement,
+    Supplier,
+    Warehouse,
+    WriteOff,
+)
+
+# Во всех списках связанные объекты подтягиваются через list_select_related,
+# чтобы колонки и __str__ не давали отдельный запрос на каждую строку.
+# Для строк документов это уже делает DetailManager (admin не применяет
+# list_select_related, если у queryset есть свой select_related).
+# Колонка __str__ берётся из аннотации with_display().
+# Большие списки дополнительно ограничивают выбираемые колонки через list_only.
+
+
+class DisplayAdmin(admin.ModelAdmin):
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_display()
+
+
+class PrunedChangeList(ChangeList):
+    def get_queryset(self, request, exclude_parameters=None):
+        return super().get_queryset(request, exclude_parameters).only(*self.model_admin.list_only)
+
+
+class ListOnlyAdmin(admin.ModelAdmin):
+    """
+    list_only - поля для .only() в списке объектов. Форма редактирования
+    по-прежнему загружает объект целиком.
+    """
+    list_only = ()
+
+    def get_changelist(self, request, **kwargs):
+        if self.list_only:
+            return PrunedChangeList
+        return super().get_changelist(request, **kwargs)
+
+
+admin.site.register(Warehouse)
+admin.site.register(Customer)
+
+
+@admin.register(Supplier)
+class SupplierAdmin(admin.ModelAdmin):
+    # Имена методов не должны совпадать с полями модели: list_display
+    # сначала ищет поле, и метод с ведущими нулями не вызывался бы
+    list_display = ('name', 'inn_display', 'ogrn_display')
+    search_fields = ('name',)
+
+    @admin.display(description='ИНН', ordering='inn')
+    def inn_display(self, obj):
+        return obj.inn_display
+
+    @admin.display(description='ОГРН', ordering='ogrn')
+    def ogrn_display(self, obj):
+        return obj.ogrn_display
+
+
+@admin.register(Product)
+class ProductAdmin(admin.ModelAdmin):
+    list_display = ('name', 'product_code', 'retail_price', 'current_stock', 'nearest_expiration')
+    search_fields = ('name', 'product_code')
+
+
+@admin.register(Batch)
+class BatchAdmin(DisplayAdmin):
+    list_display = ('__str__', 'expiration_date', 'cost_price')
+
+
+@admin.register(Inventory)
+class InventoryAdmin(DisplayAdmin):
+    list_display = ('__str__', 'batch', 'cost_price', 'retail_price')
+    list_select_related = ('product', 'batch__product')
+    readonly_fields = ('quantity',)
+
+    @admin.display(description='Закупочная цена')
+    def cost_price(self, obj):
+        return obj.batch.cost_price if obj.batch else None
+
+    @admin.display(description='Розничная цена')
+    def retail_price(self, obj):
+        return obj.product.retail_price
+
+
+class PurchaseOrderDetailInline(admin.TabularInline):
+    model = PurchaseOrderDetail
+    extra = 0
+
+
+@admin.register(PurchaseOrder)
+class PurchaseOrderAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'supplier', 'warehouse', 'status', 'total_cost')
+    list_select_related = ('supplier', 'warehouse')
+    inlines = (PurchaseOrderDetailInline,)
+
+
+@admin.register(PurchaseOrderDetail)
+class PurchaseOrderDetailAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'purchase_order', 'price')
+
+
+class GoodsReceiptDetailInline(admin.TabularInline):
+    model = GoodsReceiptDetail
+    extra = 0
+
+
+@admin.register(GoodsReceipt)
+class GoodsReceiptAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'purchase_order', 'warehouse', 'status')
+    list_select_related = ('purchase_order', 'warehouse')
+    inlines = (GoodsReceiptDetailInline,)
+
+
+@admin.register(GoodsReceiptDetail)
+class GoodsReceiptDetailAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'batch', 'quantity', 'cost_price')
+
+
+class SaleDetailInline(admin.TabularInline):
+    model = SaleDetail
+    extra = 0
+
+
+@admin.register(Sale)
+class SaleAdmin(ListOnlyAdmin):
+    list_display = ('__str__', 'warehouse', 'cashier', 'status', 'total_amount')
+    list_select_related = ('warehouse', 'cashier')
+    list_only = ('id', 'sale_date', 'status', 'total_amount_kopecks', 'warehouse__name', 'cashier__username')
+    inlines = (SaleDetailInline,)
+
+
+@admin.register(SaleDetail)
+class SaleDetailAdmin(ListOnlyAdmin):
+    list_display = ('__str__', 'batch', 'quantity', 'unit_price', 'discount', 'line_total')
+    list_only = (*SALE_DETAIL_LIST_FIELDS, 'sale__id', 'product__name', 'batch__batch_number', 'batch__product__name')
+
+
+@admin.register(WriteOff)
+class WriteOffAdmin(DisplayAdmin):
+    list_display = ('__str__', 'warehouse', 'batch', 'reason')
+    list_select_related = ('warehouse', 'batch__product')
+
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    list_display = ('ts', 'warehouse', 'product', 'batch', 'delta', 'source_type', 'source_id')
+    list_select_related = ('warehouse', 'product', 'batch__product')
+    list_filter = ('source_type',)
+
+    # Журнал только дополняется: исправление - новое движение с обратным знаком
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,13 @@
+from django.db import models
+
+
+class CaseInsensitiveCharField(models.CharField):
+    """
+    CharField на типе PostgreSQL citext (расширение citext, миграция 0011):
+    сравнение и уникальность без учёта регистра, обычный индекс используется
+    и для product_code='abc', и для 'ABC'. max_length проверяется только в Python.
+    """
+    description = "Case-insensitive string (citext)"
+
+    def db_type(self, connection):
+        return 'citext'
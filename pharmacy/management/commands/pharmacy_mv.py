@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from pharmacy.models import InventorySnapshot
+
+
+class Command(BaseCommand):
+    """
+    Обслуживание витрины остатков (pharmacy_inventory_mv).
+    Запускается по расписанию (cron / планировщик), например раз в час:
+
+        python manage.py pharmacy_mv --refresh
+    """
+    help = "Обновление materialized view остатков pharmacy_inventory_mv"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            help="Выполнить REFRESH MATERIALIZED VIEW CONCURRENTLY",
+        )
+        parser.add_argument(
+            '--blocking',
+            action='store_true',
+            help="Обновить без CONCURRENTLY (быстрее, но блокирует чтение)",
+        )
+
+    def handle(self, *args, **options):
+        if not options['refresh']:
+            self.print_help('manage.py', 'pharmacy_mv')
+            return
+
+        InventorySnapshot.refresh(concurrently=not options['blocking'])
+        self.stdout.write(self.style.SUCCESS("Витрина остатков обновлена"))
@@ -0,0 +1,248 @@
+# Generated by Django 5.1.15 on 2026-10-15 01:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Batch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('batch_number', models.CharField(blank=True, max_length=100)),
+                ('expiration_date', models.DateField(blank=True, null=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Customer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(blank=True, max_length=100)),
+                ('surname', models.CharField(blank=True, max_length=100)),
+                ('phone', models.CharField(blank=True, max_length=20)),
+                ('email', models.EmailField(blank=True, max_length=254)),
+                ('discount_card_number', models.CharField(blank=True, max_length=50)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='GoodsReceipt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('receipt_date', models.DateTimeField(auto_now_add=True)),
+                ('status', models.CharField(choices=[('pending', 'Ожидается'), ('partial', 'Частично принято'), ('completed', 'Завершено'), ('rejected', 'Отклонено')], default='pending', max_length=20)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Product',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=255)),
+                ('product_code', models.CharField(help_text='Штрихкод, внутр. код или код маркировки', max_length=100, unique=True)),
+                ('form', models.CharField(blank=True, help_text='Лекарственная форма (таблетки, капсулы и т.д.)', max_length=100)),
+                ('composition', models.TextField(blank=True, help_text='Действующее вещество / состав')),
+                ('manufacturer', models.CharField(blank=True, max_length=255)),
+                ('is_restricted', models.BooleanField(default=False, help_text='Рецептурный / особый контроль?')),
+                ('min_stock_level', models.PositiveIntegerField(default=0, help_text='Минимальный остаток')),
+                ('max_stock_level', models.PositiveIntegerField(default=0, help_text='Максимальный остаток')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='PurchaseOrder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('order_date', models.DateTimeField(auto_now_add=True)),
+                ('status', models.CharField(choices=[('draft', 'Черновик'), ('sent', 'Отправлен'), ('received', 'Получен'), ('cancelled', 'Отменён')], default='draft', max_length=20)),
+                ('total_cost', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Supplier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=255)),
+                ('contact_info', models.CharField(blank=True, max_length=255)),
+                ('address', models.CharField(blank=True, max_length=255)),
+                ('inn', models.CharField(blank=True, max_length=20, verbose_name='ИНН')),
+                ('ogrn', models.CharField(blank=True, max_length=20, verbose_name='ОГРН')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Warehouse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(help_text="Например, 'Аптека №1 на Ленина'", max_length=255)),
+                ('location', models.CharField(blank=True, max_length=255)),
+                ('warehouse_type', models.CharField(blank=True, max_length=50)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='GoodsReceiptDetail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('cost_price', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('expiration_date', models.DateField(blank=True, null=True)),
+                ('batch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='pharmacy.batch')),
+                ('goods_receipt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receipt_details', to='pharmacy.goodsreceipt')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pharmacy.product')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='batch',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='batches', to='pharmacy.product'),
+        ),
+        migrations.AddField(
+            model_name='goodsreceipt',
+            name='purchase_order',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='goods_receipts', to='pharmacy.purchaseorder'),
+        ),
+        migrations.CreateModel(
+            name='PurchaseOrderDetail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('price', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('discount', models.DecimalField(decimal_places=2, default=0, help_text='Скидка, если есть', max_digits=6)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pharmacy.product')),
+                ('purchase_order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_details', to='pharmacy.purchaseorder')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Sale',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('sale_date', models.DateTimeField(auto_now_add=True)),
+                ('status', models.CharField(choices=[('open', 'Открыт'), ('completed', 'Оплачен'), ('returned', 'Возврат')], default='open', max_length=20)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('payment_type', models.CharField(default='cash', help_text='наличные / карта / смешанная и т.д.', max_length=50)),
+                ('cashier', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('customer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='pharmacy.customer')),
+                ('warehouse', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales', to='pharmacy.warehouse')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='SaleDetail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('quantity', models.PositiveIntegerField(default=1)),
+                ('unit_price', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('discount', models.DecimalField(decimal_places=2, default=0, max_digits=6)),
+                ('batch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='pharmacy.batch')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pharmacy.product')),
+                ('sale', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sale_details', to='pharmacy.sale')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='supplier',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='purchase_orders', to='pharmacy.supplier'),
+        ),
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='warehouse',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='purchase_orders', to='pharmacy.warehouse'),
+        ),
+        migrations.AddField(
+            model_name='goodsreceipt',
+            name='warehouse',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='goods_receipts', to='pharmacy.warehouse'),
+        ),
+        migrations.CreateModel(
+            name='WriteOff',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('reason', models.CharField(blank=True, help_text='Причина списания (просрочка, брак и т.д.)', max_length=255)),
+                ('batch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='pharmacy.batch')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pharmacy.product')),
+                ('warehouse', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='write_offs', to='pharmacy.warehouse')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Inventory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('quantity', models.PositiveIntegerField(default=0, help_text='Текущее количество')),
+                ('cost_price', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('retail_price', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('batch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='pharmacy.batch')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_items', to='pharmacy.product')),
+                ('warehouse', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory', to='pharmacy.warehouse')),
+            ],
+            options={
+                'unique_together': {('warehouse', 'product', 'batch')},
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.15 on 2026-10-15 01:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='batch',
+            index=models.Index(fields=['product', 'expiration_date'], name='batch_prod_exp'),
+        ),
+        migrations.AddIndex(
+            model_name='batch',
+            index=models.Index(condition=models.Q(('expiration_date__isnull', False)), fields=['expiration_date'], name='batch_exp_notnull'),
+        ),
+        migrations.AddIndex(
+            model_name='goodsreceiptdetail',
+            index=models.Index(fields=['product', 'batch'], name='receiptdetail_prod_batch'),
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(fields=['warehouse', 'product'], include=('quantity', 'retail_price', 'cost_price'), name='inv_wh_prod_cov'),
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(fields=['product', 'batch'], name='inv_prod_batch'),
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(condition=models.Q(('quantity__gt', 0)), fields=['quantity'], name='inv_positive_qty'),
+        ),
+        migrations.AddIndex(
+            model_name='saledetail',
+            index=models.Index(fields=['product', 'batch'], name='saledetail_prod_batch'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.1.15 on 2026-10-15 01:13
+
+from django.db import migrations, models
+
+CREATE_INVENTORY_MV = """
+CREATE MATERIALIZED VIEW pharmacy_inventory_mv AS
+SELECT i.id,
+       i.warehouse_id,
+       w.name AS warehouse_name,
+       i.product_id,
+       p.name AS product_name,
+       p.product_code,
+       i.batch_id,
+       b.batch_number,
+       b.expiration_date,
+       i.quantity,
+       i.cost_price,
+       i.retail_price
+  FROM pharmacy_inventory i
+  JOIN pharmacy_product p ON p.id = i.product_id
+  JOIN pharmacy_warehouse w ON w.id = i.warehouse_id
+  LEFT JOIN pharmacy_batch b ON b.id = i.batch_id
+WITH DATA;
+CREATE UNIQUE INDEX pharmacy_inventory_mv_id ON pharmacy_inventory_mv (id);
+CREATE INDEX pharmacy_inventory_mv_wh_prod ON pharmacy_inventory_mv (warehouse_id, product_id);
+"""
+
+DROP_INVENTORY_MV = 'DROP MATERIALIZED VIEW IF EXISTS pharmacy_inventory_mv;'
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0002_inventory_batch_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_INVENTORY_MV, DROP_INVENTORY_MV),
+        migrations.CreateModel(
+            name='InventorySnapshot',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('warehouse_name', models.CharField(max_length=255)),
+                ('product_name', models.CharField(max_length=255)),
+                ('product_code', models.CharField(max_length=100)),
+                ('batch_number', models.CharField(blank=True, max_length=100, null=True)),
+                ('expiration_date', models.DateField(blank=True, null=True)),
+                ('quantity', models.PositiveIntegerField()),
+                ('cost_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('retail_price', models.DecimalField(decimal_places=2, max_digits=10)),
+            ],
+            options={
+                'db_table': 'pharmacy_inventory_mv',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 5.1.15 on 2026-10-15 01:14
+
+from django.db import migrations, models
+
+# Итог документа поддерживается инкрементально: на каждую строку -
+# один UPDATE шапки на разницу суммы строки, без пересчёта всех строк.
+TOTALS_TRIGGER_TEMPLATE = """
+CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$
+DECLARE
+    old_line numeric := 0;
+    new_line numeric := 0;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        old_line := OLD.quantity * (OLD.{price} - OLD.discount);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        new_line := NEW.quantity * (NEW.{price} - NEW.discount);
+    END IF;
+
+    IF TG_OP = 'UPDATE' AND OLD.{fk} = NEW.{fk} THEN
+        IF new_line <> old_line THEN
+            UPDATE {header} SET {total} = {total} + (new_line - old_line) WHERE id = NEW.{fk};
+        END IF;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE {header} SET {total} = {total} - old_line WHERE id = OLD.{fk};
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE {header} SET {total} = {total} + new_line WHERE id = NEW.{fk};
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER {trigger}
+AFTER INSERT OR UPDATE OR DELETE ON {detail}
+FOR EACH ROW EXECUTE FUNCTION {function}();
+
+UPDATE {header} h
+   SET {total} = COALESCE(d.total, 0)
+  FROM (
+        SELECT h2.id, SUM(d2.quantity * (d2.{price} - d2.discount)) AS total
+          FROM {header} h2
+          LEFT JOIN {detail} d2 ON d2.{fk} = h2.id
+         GROUP BY h2.id
+       ) d
+ WHERE d.id = h.id;
+"""
+
+DROP_TOTALS_TRIGGER_TEMPLATE = """
+DROP TRIGGER IF EXISTS {trigger} ON {detail};
+DROP FUNCTION IF EXISTS {function}();
+"""
+
+SALE_TOTALS = dict(
+    function='pharmacy_sale_total_trg',
+    trigger='pharmacy_saledetail_total',
+    header='pharmacy_sale',
+    total='total_amount',
+    detail='pharmacy_saledetail',
+    fk='sale_id',
+    price='unit_price',
+)
+
+PURCHASE_ORDER_TOTALS = dict(
+    function='pharmacy_purchaseorder_total_trg',
+    trigger='pharmacy_purchaseorderdetail_total',
+    header='pharmacy_purchaseorder',
+    total='total_cost',
+    detail='pharmacy_purchaseorderdetail',
+    fk='purchase_order_id',
+    price='price',
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0003_inventory_snapshot'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='purchaseorder',
+            name='total_cost',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, help_text='Пересчитывается триггером БД по строкам заказа', max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name='sale',
+            name='total_amount',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, help_text='Пересчитывается триггером БД по позициям чека', max_digits=12),
+        ),
+        migrations.RunSQL(
+            TOTALS_TRIGGER_TEMPLATE.format(**SALE_TOTALS),
+            DROP_TOTALS_TRIGGER_TEMPLATE.format(**SALE_TOTALS),
+        ),
+        migrations.RunSQL(
+            TOTALS_TRIGGER_TEMPLATE.format(**PURCHASE_ORDER_TOTALS),
+            DROP_TOTALS_TRIGGER_TEMPLATE.format(**PURCHASE_ORDER_TOTALS),
+        ),
+    ]
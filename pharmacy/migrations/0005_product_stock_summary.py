@@ -0,0 +1,42 @@
+# Generated by Django 5.1.15 on 2026-10-15 01:15
+
+from django.db import migrations, models
+
+BACKFILL_STOCK_SUMMARY = """
+UPDATE pharmacy_product p
+   SET current_stock = s.total
+  FROM (SELECT product_id, SUM(quantity) AS total
+          FROM pharmacy_inventory
+         GROUP BY product_id) s
+ WHERE s.product_id = p.id;
+
+UPDATE pharmacy_product p
+   SET nearest_expiration = s.nearest
+  FROM (SELECT b.product_id, MIN(b.expiration_date) AS nearest
+          FROM pharmacy_batch b
+          JOIN pharmacy_inventory i ON i.batch_id = b.id
+         WHERE i.quantity > 0 AND b.expiration_date IS NOT NULL
+         GROUP BY b.product_id) s
+ WHERE s.product_id = p.id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0004_document_totals_triggers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='current_stock',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, help_text='Суммарный остаток по всем складам'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='nearest_expiration',
+            field=models.DateField(blank=True, db_index=True, editable=False, help_text='Ближайший срок годности среди партий в наличии', null=True),
+        ),
+        migrations.RunSQL(BACKFILL_STOCK_SUMMARY, migrations.RunSQL.noop),
+    ]
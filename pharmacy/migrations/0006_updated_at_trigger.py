@@ -0,0 +1,113 @@
+# Generated by Django 5.1.15 on 2026-10-15 01:16
+
+import django.utils.timezone
+from django.db import migrations, models
+
+from pharmacy.triggers import create_updated_at_trigger_sql, drop_updated_at_trigger_sql
+
+CREATE_SET_UPDATED_AT = """
+CREATE OR REPLACE FUNCTION pharmacy_set_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at := now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+DROP_SET_UPDATED_AT = 'DROP FUNCTION IF EXISTS pharmacy_set_updated_at();'
+
+
+# Таблицы моделей, существующих на момент этой миграции. Новые модели-наследники
+# TimeStampedModel получают триггер своей операцией CreateUpdatedAtTrigger.
+def timestamped_tables(apps):
+    for model in apps.get_app_config('pharmacy').get_models():
+        opts = model._meta
+        if opts.managed and any(field.name == 'updated_at' for field in opts.concrete_fields):
+            yield opts.db_table
+
+
+def create_updated_at_triggers(apps, schema_editor):
+    for table in timestamped_tables(apps):
+        schema_editor.execute(create_updated_at_trigger_sql(table))
+
+
+def drop_updated_at_triggers(apps, schema_editor):
+    for table in timestamped_tables(apps):
+        schema_editor.execute(drop_updated_at_trigger_sql(table))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0005_product_stock_summary'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='batch',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='customer',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='goodsreceipt',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='goodsreceiptdetail',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='inventory',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='purchaseorder',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='purchaseorderdetail',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='sale',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='saledetail',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='supplier',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='warehouse',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='writeoff',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.RunSQL(CREATE_SET_UPDATED_AT, DROP_SET_UPDATED_AT),
+        migrations.RunPython(create_updated_at_triggers, drop_updated_at_triggers),
+    ]
@@ -0,0 +1,178 @@
+# Generated by Django 5.1.15 on 2026-10-15 01:17
+
+from django.db import migrations, models
+
+from pharmacy.triggers import without_updated_at_triggers
+
+# (модель, старое DecimalField-поле, editable, help_text нового поля *_kopecks).
+# Итоги документов идут последними: UPDATE строк вызывает триггер итогов,
+# и итог шапки должен быть перезаписан уже после него.
+MONEY_FIELDS = [
+    ('inventory', 'cost_price', True, 'Закупочная цена, коп.'),
+    ('inventory', 'retail_price', True, 'Розничная цена, коп.'),
+    ('purchaseorderdetail', 'price', True, 'Цена, коп.'),
+    ('purchaseorderdetail', 'discount', True, 'Скидка на единицу, коп., если есть'),
+    ('goodsreceiptdetail', 'cost_price', True, 'Закупочная цена, коп.'),
+    ('saledetail', 'unit_price', True, 'Цена, коп.'),
+    ('saledetail', 'discount', True, 'Скидка на единицу, коп.'),
+    ('purchaseorder', 'total_cost', False, 'Сумма заказа, коп. Пересчитывается триггером БД по строкам заказа'),
+    ('sale', 'total_amount', False, 'Сумма чека, коп. Пересчитывается триггером БД по позициям чека'),
+]
+
+# Конвертация не должна сдвигать updated_at (история изменений записей)
+MONEY_TABLES = list(dict.fromkeys(f'pharmacy_{model}' for model, _, _, _ in MONEY_FIELDS))
+
+TO_KOPECKS_SQL = without_updated_at_triggers('\n'.join(
+    f'UPDATE pharmacy_{model} SET {field}_kopecks = round({field} * 100)::bigint;'
+    for model, field, _, _ in MONEY_FIELDS
+), MONEY_TABLES)
+
+FROM_KOPECKS_SQL = without_updated_at_triggers('\n'.join(
+    f'UPDATE pharmacy_{model} SET {field} = {field}_kopecks / 100.0;'
+    for model, field, _, _ in MONEY_FIELDS
+), MONEY_TABLES)
+
+INVENTORY_MV_TEMPLATE = """
+CREATE MATERIALIZED VIEW pharmacy_inventory_mv AS
+SELECT i.id,
+       i.warehouse_id,
+       w.name AS warehouse_name,
+       i.product_id,
+       p.name AS product_name,
+       p.product_code,
+       i.batch_id,
+       b.batch_number,
+       b.expiration_date,
+       i.quantity,
+       i.{cost_price},
+       i.{retail_price}
+  FROM pharmacy_inventory i
+  JOIN pharmacy_product p ON p.id = i.product_id
+  JOIN pharmacy_warehouse w ON w.id = i.warehouse_id
+  LEFT JOIN pharmacy_batch b ON b.id = i.batch_id
+WITH DATA;
+CREATE UNIQUE INDEX pharmacy_inventory_mv_id ON pharmacy_inventory_mv (id);
+CREATE INDEX pharmacy_inventory_mv_wh_prod ON pharmacy_inventory_mv (warehouse_id, product_id);
+"""
+
+DROP_INVENTORY_MV = 'DROP MATERIALIZED VIEW IF EXISTS pharmacy_inventory_mv;'
+
+# Тело функций триггеров итогов (0004) на копейках: целочисленная арифметика
+TOTALS_FUNCTION_TEMPLATE = """
+CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$
+DECLARE
+    old_line {line_type} := 0;
+    new_line {line_type} := 0;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        old_line := OLD.quantity * (OLD.{price} - OLD.{discount});
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        new_line := NEW.quantity * (NEW.{price} - NEW.{discount});
+    END IF;
+
+    IF TG_OP = 'UPDATE' AND OLD.{fk} = NEW.{fk} THEN
+        IF new_line <> old_line THEN
+            UPDATE {header} SET {total} = {total} + (new_line - old_line) WHERE id = NEW.{fk};
+        END IF;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE {header} SET {total} = {total} - old_line WHERE id = OLD.{fk};
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE {header} SET {total} = {total} + new_line WHERE id = NEW.{fk};
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+SALE_TOTALS = dict(
+    function='pharmacy_sale_total_trg',
+    header='pharmacy_sale',
+    fk='sale_id',
+)
+
+PURCHASE_ORDER_TOTALS = dict(
+    function='pharmacy_purchaseorder_total_trg',
+    header='pharmacy_purchaseorder',
+    fk='purchase_order_id',
+)
+
+KOPECKS_COLUMNS = dict(line_type='bigint', discount='discount_kopecks')
+DECIMAL_COLUMNS = dict(line_type='numeric', discount='discount')
+
+
+def totals_functions_sql(columns, sale_columns, purchase_order_columns):
+    return (
+        TOTALS_FUNCTION_TEMPLATE.format(**SALE_TOTALS, **columns, **sale_columns)
+        + TOTALS_FUNCTION_TEMPLATE.format(**PURCHASE_ORDER_TOTALS, **columns, **purchase_order_columns)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0006_updated_at_trigger'),
+    ]
+
+    operations = [
+        # Витрина и покрывающий индекс ссылаются на старые колонки цен
+        migrations.RunSQL(
+            DROP_INVENTORY_MV,
+            INVENTORY_MV_TEMPLATE.format(cost_price='cost_price', retail_price='retail_price'),
+        ),
+        migrations.RemoveIndex(
+            model_name='inventory',
+            name='inv_wh_prod_cov',
+        ),
+        *[
+            migrations.AddField(
+                model_name=model,
+                name=f'{field}_kopecks',
+                field=models.BigIntegerField(default=0, editable=editable, help_text=help_text),
+            )
+            for model, field, editable, help_text in MONEY_FIELDS
+        ],
+        migrations.RunSQL(TO_KOPECKS_SQL, FROM_KOPECKS_SQL),
+        *[
+            migrations.RemoveField(model_name=model, name=field)
+            for model, field, _, _ in MONEY_FIELDS
+        ],
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(fields=['warehouse', 'product'], include=('quantity', 'retail_price_kopecks', 'cost_price_kopecks'), name='inv_wh_prod_cov'),
+        ),
+        migrations.RunSQL(
+            totals_functions_sql(
+                KOPECKS_COLUMNS,
+                dict(price='unit_price_kopecks', total='total_amount_kopecks'),
+                dict(price='price_kopecks', total='total_cost_kopecks'),
+            ),
+            totals_functions_sql(
+                DECIMAL_COLUMNS,
+                dict(price='unit_price', total='total_amount'),
+                dict(price='price', total='total_cost'),
+            ),
+        ),
+        migrations.RunSQL(
+            INVENTORY_MV_TEMPLATE.format(cost_price='cost_price_kopecks', retail_price='retail_price_kopecks'),
+            DROP_INVENTORY_MV,
+            state_operations=[
+                migrations.RemoveField(model_name='inventorysnapshot', name='cost_price'),
+                migrations.RemoveField(model_name='inventorysnapshot', name='retail_price'),
+                migrations.AddField(
+                    model_name='inventorysnapshot',
+                    name='cost_price_kopecks',
+                    field=models.BigIntegerField(),
+                ),
+                migrations.AddField(
+                    model_name='inventorysnapshot',
+                    name='retail_price_kopecks',
+                    field=models.BigIntegerField(),
+                ),
+            ],
+        ),
+    ]
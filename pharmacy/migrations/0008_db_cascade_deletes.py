@@ -0,0 +1,81 @@
+# Generated by Django 5.1.15 on 2026-10-15 01:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Внешний ключ пересоздаётся с действием ON DELETE на стороне БД.
+# Имя исходного ограничения Django генерирует с хэшем, поэтому ищем его в каталоге.
+REPLACE_FK_TEMPLATE = """
+DO $$
+DECLARE
+    fk_name text;
+BEGIN
+    SELECT c.conname INTO fk_name
+      FROM pg_constraint c
+      JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = ANY (c.conkey)
+     WHERE c.conrelid = '{table}'::regclass
+       AND c.contype = 'f'
+       AND a.attname = '{column}';
+    IF fk_name IS NOT NULL THEN
+        EXECUTE format('ALTER TABLE {table} DROP CONSTRAINT %I', fk_name);
+    END IF;
+END $$;
+ALTER TABLE {table}
+  ADD CONSTRAINT {table}_{column}_fk_{suffix}
+  FOREIGN KEY ({column}) REFERENCES {target} (id) {action}
+  DEFERRABLE INITIALLY DEFERRED;
+"""
+
+DB_ON_DELETE = [
+    # (таблица, колонка, таблица-ссылка, действие)
+    ('pharmacy_purchaseorderdetail', 'purchase_order_id', 'pharmacy_purchaseorder', 'ON DELETE CASCADE'),
+    ('pharmacy_goodsreceiptdetail', 'goods_receipt_id', 'pharmacy_goodsreceipt', 'ON DELETE CASCADE'),
+    ('pharmacy_saledetail', 'sale_id', 'pharmacy_sale', 'ON DELETE CASCADE'),
+    ('pharmacy_goodsreceipt', 'purchase_order_id', 'pharmacy_purchaseorder', 'ON DELETE SET NULL'),
+]
+
+
+def db_on_delete_sql(table, column, target, action):
+    return REPLACE_FK_TEMPLATE.format(
+        table=table, column=column, target=target, action=action, suffix='db_on_delete',
+    )
+
+
+def plain_fk_sql(table, column, target, action):
+    return REPLACE_FK_TEMPLATE.format(
+        table=table, column=column, target=target, action='', suffix='plain',
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0007_money_kopecks'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='goodsreceipt',
+            name='purchase_order',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='goods_receipts', to='pharmacy.purchaseorder'),
+        ),
+        migrations.AlterField(
+            model_name='goodsreceiptdetail',
+            name='goods_receipt',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='receipt_details', to='pharmacy.goodsreceipt'),
+        ),
+        migrations.AlterField(
+            model_name='purchaseorderdetail',
+            name='purchase_order',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='order_details', to='pharmacy.purchaseorder'),
+        ),
+        migrations.AlterField(
+            model_name='saledetail',
+            name='sale',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='sale_details', to='pharmacy.sale'),
+        ),
+        *[
+            migrations.RunSQL(db_on_delete_sql(*fk), plain_fk_sql(*fk))
+            for fk in DB_ON_DELETE
+        ],
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.1.15 on 2026-10-15 01:20
+
+from django.db import migrations, models
+
+from pharmacy.triggers import without_updated_at_triggers
+
+SALE_DATE_TRIGGERS = """
+CREATE OR REPLACE FUNCTION pharmacy_saledetail_sale_date_trg() RETURNS trigger AS $$
+BEGIN
+    SELECT sale_date INTO NEW.sale_date FROM pharmacy_sale WHERE id = NEW.sale_id;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER pharmacy_saledetail_sale_date
+BEFORE INSERT OR UPDATE OF sale_id ON pharmacy_saledetail
+FOR EACH ROW EXECUTE FUNCTION pharmacy_saledetail_sale_date_trg();
+
+CREATE OR REPLACE FUNCTION pharmacy_sale_sale_date_trg() RETURNS trigger AS $$
+BEGIN
+    UPDATE pharmacy_saledetail SET sale_date = NEW.sale_date WHERE sale_id = NEW.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER pharmacy_sale_sale_date
+AFTER UPDATE OF sale_date ON pharmacy_sale
+FOR EACH ROW WHEN (OLD.sale_date IS DISTINCT FROM NEW.sale_date)
+EXECUTE FUNCTION pharmacy_sale_sale_date_trg();
+"""
+
+# Заполнение копии даты не считается изменением позиции - updated_at не трогаем
+BACKFILL_SALE_DATE = without_updated_at_triggers("""
+UPDATE pharmacy_saledetail d
+   SET sale_date = s.sale_date
+  FROM pharmacy_sale s
+ WHERE s.id = d.sale_id;
+""", ['pharmacy_saledetail'])
+
+DROP_SALE_DATE_TRIGGERS = """
+DROP TRIGGER IF EXISTS pharmacy_sale_sale_date ON pharmacy_sale;
+DROP FUNCTION IF EXISTS pharmacy_sale_sale_date_trg();
+DROP TRIGGER IF EXISTS pharmacy_saledetail_sale_date ON pharmacy_saledetail;
+DROP FUNCTION IF EXISTS pharmacy_saledetail_sale_date_trg();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0008_db_cascade_deletes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='saledetail',
+            name='sale_date',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='sale',
+            name='sale_date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.RunSQL(SALE_DATE_TRIGGERS, DROP_SALE_DATE_TRIGGERS),
+        migrations.RunSQL(BACKFILL_SALE_DATE, migrations.RunSQL.noop),
+    ]
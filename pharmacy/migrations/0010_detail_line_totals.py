@@ -0,0 +1,29 @@
+# Generated by Django 5.1.15 on 2026-10-15 01:22
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0009_saledetail_sale_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goodsreceiptdetail',
+            name='line_total_kopecks',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('quantity'), '*', models.F('cost_price_kopecks')), help_text='Сумма строки, коп. (вычисляется БД)', output_field=models.BigIntegerField()),
+        ),
+        migrations.AddField(
+            model_name='purchaseorderdetail',
+            name='line_total_kopecks',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('quantity'), '*', django.db.models.expressions.CombinedExpression(models.F('price_kopecks'), '-', models.F('discount_kopecks'))), help_text='Сумма строки, коп. (вычисляется БД)', output_field=models.BigIntegerField()),
+        ),
+        migrations.AddField(
+            model_name='saledetail',
+            name='line_total_kopecks',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('quantity'), '*', django.db.models.expressions.CombinedExpression(models.F('unit_price_kopecks'), '-', models.F('discount_kopecks'))), help_text='Сумма позиции, коп. (вычисляется БД)', output_field=models.BigIntegerField()),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.15 on 2026-10-15 01:23
+
+import django.contrib.postgres.indexes
+import pharmacy.fields
+from django.contrib.postgres.operations import CITextExtension
+from django.db import migrations
+
+# Витрина остатков (0007) читает product_code - тип колонки нельзя сменить,
+# пока от неё зависит materialized view.
+CREATE_INVENTORY_MV = """
+CREATE MATERIALIZED VIEW pharmacy_inventory_mv AS
+SELECT i.id,
+       i.warehouse_id,
+       w.name AS warehouse_name,
+       i.product_id,
+       p.name AS product_name,
+       p.product_code,
+       i.batch_id,
+       b.batch_number,
+       b.expiration_date,
+       i.quantity,
+       i.cost_price_kopecks,
+       i.retail_price_kopecks
+  FROM pharmacy_inventory i
+  JOIN pharmacy_product p ON p.id = i.product_id
+  JOIN pharmacy_warehouse w ON w.id = i.warehouse_id
+  LEFT JOIN pharmacy_batch b ON b.id = i.batch_id
+WITH DATA;
+CREATE UNIQUE INDEX pharmacy_inventory_mv_id ON pharmacy_inventory_mv (id);
+CREATE INDEX pharmacy_inventory_mv_wh_prod ON pharmacy_inventory_mv (warehouse_id, product_id);
+"""
+
+DROP_INVENTORY_MV = 'DROP MATERIALIZED VIEW IF EXISTS pharmacy_inventory_mv;'
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0010_detail_line_totals'),
+    ]
+
+    operations = [
+        CITextExtension(),
+        migrations.RunSQL(DROP_INVENTORY_MV, CREATE_INVENTORY_MV),
+        migrations.AlterField(
+            model_name='product',
+            name='product_code',
+            field=pharmacy.fields.CaseInsensitiveCharField(help_text='Штрихкод, внутр. код или код маркировки (без учёта регистра)', max_length=100, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.HashIndex(fields=['product_code'], name='prod_code_hash'),
+        ),
+        migrations.RunSQL(CREATE_INVENTORY_MV, DROP_INVENTORY_MV),
+    ]
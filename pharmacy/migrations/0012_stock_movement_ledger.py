@@ -0,0 +1,100 @@
+# Generated by Django 5.1.15 on 2026-10-15 01:24
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+# Входящий остаток: по одному движению-корректировке на каждую строку Inventory.
+# Выполняется до создания триггера, иначе остатки удвоятся.
+BACKFILL_OPENING_BALANCE = """
+INSERT INTO pharmacy_stockmovement (warehouse_id, product_id, batch_id, delta, source_type, source_id, ts)
+SELECT warehouse_id, product_id, batch_id, quantity, 'adjustment', NULL, now()
+  FROM pharmacy_inventory
+ WHERE quantity <> 0;
+"""
+
+# Триггер журнала: INSERT движения сдвигает Inventory.quantity (создавая строку
+# остатка при первом приходе) и Product.current_stock. CHECK (quantity >= 0)
+# на pharmacy_inventory не даёт списать больше, чем есть.
+STOCK_MOVEMENT_TRIGGER = """
+CREATE OR REPLACE FUNCTION pharmacy_stockmovement_apply_trg() RETURNS trigger AS $$
+DECLARE
+    new_quantity integer;
+BEGIN
+    UPDATE pharmacy_inventory
+       SET quantity = quantity + NEW.delta
+     WHERE warehouse_id = NEW.warehouse_id
+       AND product_id = NEW.product_id
+       AND batch_id IS NOT DISTINCT FROM NEW.batch_id
+    RETURNING quantity INTO new_quantity;
+
+    IF NOT FOUND THEN
+        INSERT INTO pharmacy_inventory
+            (warehouse_id, product_id, batch_id, quantity,
+             cost_price_kopecks, retail_price_kopecks, created_at, updated_at)
+        VALUES (NEW.warehouse_id, NEW.product_id, NEW.batch_id, NEW.delta, 0, 0, now(), now());
+        new_quantity := NEW.delta;
+    END IF;
+
+    UPDATE pharmacy_product
+       SET current_stock = current_stock + NEW.delta
+     WHERE id = NEW.product_id;
+
+    -- Партия появилась в наличии или закончилась - пересчитать ближайший срок
+    IF NEW.batch_id IS NOT NULL AND (new_quantity = 0 OR new_quantity = NEW.delta) THEN
+        UPDATE pharmacy_product p
+           SET nearest_expiration = (
+               SELECT MIN(b.expiration_date)
+                 FROM pharmacy_batch b
+                 JOIN pharmacy_inventory i ON i.batch_id = b.id
+                WHERE b.product_id = p.id AND i.quantity > 0
+           )
+         WHERE p.id = NEW.product_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER pharmacy_stockmovement_apply
+AFTER INSERT ON pharmacy_stockmovement
+FOR EACH ROW EXECUTE FUNCTION pharmacy_stockmovement_apply_trg();
+"""
+
+DROP_STOCK_MOVEMENT_TRIGGER = """
+DROP TRIGGER IF EXISTS pharmacy_stockmovement_apply ON pharmacy_stockmovement;
+DROP FUNCTION IF EXISTS pharmacy_stockmovement_apply_trg();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0011_product_code_citext'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delta', models.IntegerField(help_text='Изменение количества (+ приход, - расход)')),
+                ('source_type', models.CharField(choices=[('sale', 'Продажа'), ('receipt', 'Приёмка'), ('write_off', 'Списание'), ('adjustment', 'Корректировка')], max_length=20)),
+                ('source_id', models.BigIntegerField(blank=True, help_text='id документа-источника', null=True)),
+                ('ts', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('batch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='pharmacy.batch')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='pharmacy.product')),
+                ('warehouse', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='pharmacy.warehouse')),
+            ],
+            options={
+                'indexes': [django.contrib.postgres.indexes.BrinIndex(fields=['ts'], name='stockmove_ts_brin'), models.Index(fields=['warehouse', 'product', 'batch'], name='stockmove_wh_prod_batch')],
+            },
+        ),
+        migrations.AlterField(
+            model_name='inventory',
+            name='quantity',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Остаток по журналу движений StockMovement'),
+        ),
+        migrations.RunSQL(BACKFILL_OPENING_BALANCE, 'DELETE FROM pharmacy_stockmovement;'),
+        migrations.RunSQL(STOCK_MOVEMENT_TRIGGER, DROP_STOCK_MOVEMENT_TRIGGER),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.15 on 2026-10-15 01:26
+
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0012_stock_movement_ledger'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sale',
+            name='sale_date',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='saledetail',
+            name='sale_date',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='goodsreceipt',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['receipt_date'], name='goodsreceipt_date_brin', pages_per_range=32),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['order_date'], name='purchaseorder_date_brin', pages_per_range=32),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['sale_date'], name='sale_date_brin', pages_per_range=32),
+        ),
+        migrations.AddIndex(
+            model_name='saledetail',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['sale_date'], name='saledetail_date_brin', pages_per_range=32),
+        ),
+    ]
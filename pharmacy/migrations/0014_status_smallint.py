@@ -0,0 +1,77 @@
+# Generated by Django 5.1.15 on 2026-10-15 01:31
+
+from django.db import migrations, models
+
+from pharmacy.triggers import without_updated_at_triggers
+
+# (модель, статусы в порядке кодов 0, 1, 2...) - как в IntegerChoices моделей
+STATUSES = [
+    ('purchaseorder', ['draft', 'sent', 'received', 'cancelled']),
+    ('goodsreceipt', ['pending', 'partial', 'completed', 'rejected']),
+    ('sale', ['open', 'completed', 'returned']),
+]
+
+
+# Перекодировка статусов не должна сдвигать updated_at документов
+STATUS_TABLES = [f'pharmacy_{model}' for model, _ in STATUSES]
+
+
+def to_code_sql(model, values):
+    cases = ' '.join(f"WHEN '{value}' THEN {code}" for code, value in enumerate(values))
+    return f'UPDATE pharmacy_{model} SET status_code = CASE status {cases} ELSE 0 END;'
+
+
+def from_code_sql(model, values):
+    cases = ' '.join(f"WHEN {code} THEN '{value}'" for code, value in enumerate(values))
+    return f"UPDATE pharmacy_{model} SET status = CASE status_code {cases} END;"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0013_date_brin_indexes'),
+    ]
+
+    operations = [
+        *[
+            migrations.AddField(
+                model_name=model,
+                name='status_code',
+                field=models.PositiveSmallIntegerField(default=0),
+            )
+            for model, _ in STATUSES
+        ],
+        migrations.RunSQL(
+            without_updated_at_triggers(
+                '\n'.join(to_code_sql(model, values) for model, values in STATUSES),
+                STATUS_TABLES,
+            ),
+            without_updated_at_triggers(
+                '\n'.join(from_code_sql(model, values) for model, values in STATUSES),
+                STATUS_TABLES,
+            ),
+        ),
+        *[
+            migrations.RemoveField(model_name=model, name='status')
+            for model, _ in STATUSES
+        ],
+        *[
+            migrations.RenameField(model_name=model, old_name='status_code', new_name='status')
+            for model, _ in STATUSES
+        ],
+        migrations.AlterField(
+            model_name='purchaseorder',
+            name='status',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'Черновик'), (1, 'Отправлен'), (2, 'Получен'), (3, 'Отменён')], default=0),
+        ),
+        migrations.AlterField(
+            model_name='goodsreceipt',
+            name='status',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'Ожидается'), (1, 'Частично принято'), (2, 'Завершено'), (3, 'Отклонено')], default=0),
+        ),
+        migrations.AlterField(
+            model_name='sale',
+            name='status',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'Открыт'), (1, 'Оплачен'), (2, 'Возврат')], default=0),
+        ),
+    ]
@@ -0,0 +1,145 @@
+# Generated by Django 5.1.15 on 2026-10-15 01:34
+
+from django.db import migrations, models
+
+from pharmacy.triggers import without_updated_at_triggers
+
+# Витрина остатков: цены теперь берутся из партии и товара
+INVENTORY_MV_TEMPLATE = """
+CREATE MATERIALIZED VIEW pharmacy_inventory_mv AS
+SELECT i.id,
+       i.warehouse_id,
+       w.name AS warehouse_name,
+       i.product_id,
+       p.name AS product_name,
+       p.product_code,
+       i.batch_id,
+       b.batch_number,
+       b.expiration_date,
+       i.quantity,
+       {cost_price} AS cost_price_kopecks,
+       {retail_price} AS retail_price_kopecks
+  FROM pharmacy_inventory i
+  JOIN pharmacy_product p ON p.id = i.product_id
+  JOIN pharmacy_warehouse w ON w.id = i.warehouse_id
+  LEFT JOIN pharmacy_batch b ON b.id = i.batch_id
+WITH DATA;
+CREATE UNIQUE INDEX pharmacy_inventory_mv_id ON pharmacy_inventory_mv (id);
+CREATE INDEX pharmacy_inventory_mv_wh_prod ON pharmacy_inventory_mv (warehouse_id, product_id);
+"""
+
+INVENTORY_PRICES_MV = dict(cost_price='COALESCE(b.cost_price_kopecks, 0)', retail_price='p.retail_price_kopecks')
+BATCH_PRODUCT_PRICES_MV = dict(cost_price='i.cost_price_kopecks', retail_price='i.retail_price_kopecks')
+
+DROP_INVENTORY_MV = 'DROP MATERIALIZED VIEW IF EXISTS pharmacy_inventory_mv;'
+
+# Одна партия / товар на нескольких складах могли иметь разные цены - берём максимальную.
+# Перенос цен не сдвигает updated_at записей.
+PRICES_FROM_INVENTORY_SQL = without_updated_at_triggers("""
+UPDATE pharmacy_batch b
+   SET cost_price_kopecks = s.cost_price_kopecks
+  FROM (SELECT batch_id, MAX(cost_price_kopecks) AS cost_price_kopecks
+          FROM pharmacy_inventory
+         WHERE batch_id IS NOT NULL
+         GROUP BY batch_id) s
+ WHERE s.batch_id = b.id;
+
+UPDATE pharmacy_product p
+   SET retail_price_kopecks = s.retail_price_kopecks
+  FROM (SELECT product_id, MAX(retail_price_kopecks) AS retail_price_kopecks
+          FROM pharmacy_inventory
+         GROUP BY product_id) s
+ WHERE s.product_id = p.id;
+""", ['pharmacy_batch', 'pharmacy_product'])
+
+PRICES_TO_INVENTORY_SQL = without_updated_at_triggers("""
+UPDATE pharmacy_inventory i
+   SET cost_price_kopecks = COALESCE((SELECT b.cost_price_kopecks FROM pharmacy_batch b WHERE b.id = i.batch_id), 0),
+       retail_price_kopecks = (SELECT p.retail_price_kopecks FROM pharmacy_product p WHERE p.id = i.product_id);
+""", ['pharmacy_inventory'])
+
+# Триггер журнала движений (0012) создаёт строку остатка без цен
+STOCK_MOVEMENT_FUNCTION_TEMPLATE = """
+CREATE OR REPLACE FUNCTION pharmacy_stockmovement_apply_trg() RETURNS trigger AS $$
+DECLARE
+    new_quantity integer;
+BEGIN
+    UPDATE pharmacy_inventory
+       SET quantity = quantity + NEW.delta
+     WHERE warehouse_id = NEW.warehouse_id
+       AND product_id = NEW.product_id
+       AND batch_id IS NOT DISTINCT FROM NEW.batch_id
+    RETURNING quantity INTO new_quantity;
+
+    IF NOT FOUND THEN
+        INSERT INTO pharmacy_inventory
+            (warehouse_id, product_id, batch_id, quantity, {price_columns}created_at, updated_at)
+        VALUES (NEW.warehouse_id, NEW.product_id, NEW.batch_id, NEW.delta, {price_values}now(), now());
+        new_quantity := NEW.delta;
+    END IF;
+
+    UPDATE pharmacy_product
+       SET current_stock = current_stock + NEW.delta
+     WHERE id = NEW.product_id;
+
+    -- Партия появилась в наличии или закончилась - пересчитать ближайший срок
+    IF NEW.batch_id IS NOT NULL AND (new_quantity = 0 OR new_quantity = NEW.delta) THEN
+        UPDATE pharmacy_product p
+           SET nearest_expiration = (
+               SELECT MIN(b.expiration_date)
+                 FROM pharmacy_batch b
+                 JOIN pharmacy_inventory i ON i.batch_id = b.id
+                WHERE b.product_id = p.id AND i.quantity > 0
+           )
+         WHERE p.id = NEW.product_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0014_status_smallint'),
+    ]
+
+    operations = [
+        migrations.RunSQL(DROP_INVENTORY_MV, INVENTORY_MV_TEMPLATE.format(**BATCH_PRODUCT_PRICES_MV)),
+        migrations.AddField(
+            model_name='batch',
+            name='cost_price_kopecks',
+            field=models.BigIntegerField(default=0, help_text='Закупочная цена, коп.'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='retail_price_kopecks',
+            field=models.BigIntegerField(default=0, help_text='Розничная цена, коп.'),
+        ),
+        migrations.RunSQL(PRICES_FROM_INVENTORY_SQL, PRICES_TO_INVENTORY_SQL),
+        migrations.RemoveIndex(
+            model_name='inventory',
+            name='inv_wh_prod_cov',
+        ),
+        migrations.RemoveField(
+            model_name='inventory',
+            name='cost_price_kopecks',
+        ),
+        migrations.RemoveField(
+            model_name='inventory',
+            name='retail_price_kopecks',
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(fields=['warehouse', 'product'], include=('quantity',), name='inv_wh_prod_cov'),
+        ),
+        migrations.RunSQL(
+            STOCK_MOVEMENT_FUNCTION_TEMPLATE.format(price_columns='', price_values=''),
+            STOCK_MOVEMENT_FUNCTION_TEMPLATE.format(
+                price_columns='cost_price_kopecks, retail_price_kopecks, ',
+                price_values='0, 0, ',
+            ),
+        ),
+        migrations.RunSQL(INVENTORY_MV_TEMPLATE.format(**INVENTORY_PRICES_MV), DROP_INVENTORY_MV),
+    ]
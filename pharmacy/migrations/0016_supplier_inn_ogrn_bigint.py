@@ -0,0 +1,74 @@
+# Generated by Django 5.1.15 on 2026-10-15 01:33
+
+import pharmacy.validators
+from django.db import migrations, models
+
+# Разделители (пробелы, дефисы и т.п.) отбрасываются, пустые значения
+# становятся NULL. Если после этого ИНН / ОГРН не 10/12 и не 13/15 цифр -
+# миграция останавливается со списком поставщиков: данные не теряются,
+# их нужно исправить вручную.
+TO_BIGINT_SQL = """
+DO $$
+DECLARE
+    bad text;
+BEGIN
+    SELECT string_agg(format('#%s (ИНН %L, ОГРН %L)', id, inn, ogrn), ', ' ORDER BY id) INTO bad
+      FROM pharmacy_supplier
+     WHERE (btrim(inn) <> '' AND regexp_replace(inn, '[^0-9]', '', 'g') !~ '^([0-9]{10}|[0-9]{12})$')
+        OR (btrim(ogrn) <> '' AND regexp_replace(ogrn, '[^0-9]', '', 'g') !~ '^([0-9]{13}|[0-9]{15})$');
+    IF bad IS NOT NULL THEN
+        RAISE EXCEPTION 'Некорректные ИНН / ОГРН у поставщиков: %', bad;
+    END IF;
+END $$;
+
+ALTER TABLE pharmacy_supplier
+    ALTER COLUMN inn DROP NOT NULL,
+    ALTER COLUMN inn TYPE bigint
+        USING CASE WHEN btrim(inn) <> '' THEN regexp_replace(inn, '[^0-9]', '', 'g')::bigint END,
+    ALTER COLUMN ogrn DROP NOT NULL,
+    ALTER COLUMN ogrn TYPE bigint
+        USING CASE WHEN btrim(ogrn) <> '' THEN regexp_replace(ogrn, '[^0-9]', '', 'g')::bigint END;
+"""
+
+TO_VARCHAR_SQL = """
+ALTER TABLE pharmacy_supplier
+    ALTER COLUMN inn TYPE varchar(20)
+        USING COALESCE(lpad(inn::text, CASE WHEN inn < 10000000000 THEN 10 ELSE 12 END, '0'), ''),
+    ALTER COLUMN inn SET NOT NULL,
+    ALTER COLUMN ogrn TYPE varchar(20) USING COALESCE(ogrn::text, ''),
+    ALTER COLUMN ogrn SET NOT NULL;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0015_prices_to_batch_and_product'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            TO_BIGINT_SQL,
+            TO_VARCHAR_SQL,
+            state_operations=[
+                migrations.AlterField(
+                    model_name='supplier',
+                    name='inn',
+                    field=models.BigIntegerField(blank=True, null=True, validators=[pharmacy.validators.validate_inn], verbose_name='ИНН'),
+                ),
+                migrations.AlterField(
+                    model_name='supplier',
+                    name='ogrn',
+                    field=models.BigIntegerField(blank=True, null=True, validators=[pharmacy.validators.validate_ogrn], verbose_name='ОГРН'),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='supplier',
+            constraint=models.CheckConstraint(condition=models.Q(('inn__range', (100000000, 999999999999))), name='supplier_inn_range'),
+        ),
+        migrations.AddConstraint(
+            model_name='supplier',
+            constraint=models.CheckConstraint(condition=models.Q(('ogrn__range', (1000000000000, 9999999999999)), ('ogrn__range', (100000000000000, 999999999999999)), _connector='OR'), name='supplier_ogrn_range'),
+        ),
+    ]
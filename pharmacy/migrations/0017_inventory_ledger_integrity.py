@@ -0,0 +1,129 @@
+# Generated by Django 5.1.15 on 2026-10-15 01:44
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+from pharmacy.triggers import without_updated_at_triggers
+
+prices_migration = import_module('pharmacy.migrations.0015_prices_to_batch_and_product')
+
+# Остатки без партии могли задвоиться (NULL не конфликтовал в unique_together):
+# складываем их в строку с меньшим id перед созданием ограничения
+MERGE_DUPLICATE_INVENTORY = without_updated_at_triggers("""
+UPDATE pharmacy_inventory i
+   SET quantity = d.total
+  FROM (SELECT MIN(id) AS keep_id, SUM(quantity) AS total
+          FROM pharmacy_inventory
+         WHERE batch_id IS NULL
+         GROUP BY warehouse_id, product_id
+        HAVING COUNT(*) > 1) d
+ WHERE i.id = d.keep_id;
+
+DELETE FROM pharmacy_inventory i
+ USING pharmacy_inventory k
+ WHERE i.batch_id IS NULL AND k.batch_id IS NULL
+   AND i.warehouse_id = k.warehouse_id AND i.product_id = k.product_id
+   AND i.id > k.id;
+""", ['pharmacy_inventory'])
+
+# Первый приход в строку остатка: INSERT ... ON CONFLICT, чтобы одновременные
+# первые приходы не падали на уникальности и не создавали дублей
+STOCK_MOVEMENT_FUNCTION = """
+CREATE OR REPLACE FUNCTION pharmacy_stockmovement_apply_trg() RETURNS trigger AS $$
+DECLARE
+    new_quantity integer;
+BEGIN
+    UPDATE pharmacy_inventory
+       SET quantity = quantity + NEW.delta
+     WHERE warehouse_id = NEW.warehouse_id
+       AND product_id = NEW.product_id
+       AND batch_id IS NOT DISTINCT FROM NEW.batch_id
+    RETURNING quantity INTO new_quantity;
+
+    IF NOT FOUND THEN
+        INSERT INTO pharmacy_inventory AS i
+            (warehouse_id, product_id, batch_id, quantity, created_at, updated_at)
+        VALUES (NEW.warehouse_id, NEW.product_id, NEW.batch_id, NEW.delta, now(), now())
+        ON CONFLICT (warehouse_id, product_id, batch_id)
+        DO UPDATE SET quantity = i.quantity + EXCLUDED.quantity
+        RETURNING quantity INTO new_quantity;
+    END IF;
+
+    UPDATE pharmacy_product
+       SET current_stock = current_stock + NEW.delta
+     WHERE id = NEW.product_id;
+
+    -- Партия появилась в наличии или закончилась - пересчитать ближайший срок
+    IF NEW.batch_id IS NOT NULL AND (new_quantity = 0 OR new_quantity = NEW.delta) THEN
+        UPDATE pharmacy_product p
+           SET nearest_expiration = (
+               SELECT MIN(b.expiration_date)
+                 FROM pharmacy_batch b
+                 JOIN pharmacy_inventory i ON i.batch_id = b.id
+                WHERE b.product_id = p.id AND i.quantity > 0
+           )
+         WHERE p.id = NEW.product_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Удаление строки остатка (вручную или каскадом от склада / товара) снимает
+# её количество с Product.current_stock - вместо сигналов post_delete
+INVENTORY_DELETE_TRIGGER = """
+CREATE OR REPLACE FUNCTION pharmacy_inventory_delete_trg() RETURNS trigger AS $$
+BEGIN
+    UPDATE pharmacy_product
+       SET current_stock = current_stock - OLD.quantity
+     WHERE id = OLD.product_id;
+
+    IF OLD.batch_id IS NOT NULL AND OLD.quantity > 0 THEN
+        UPDATE pharmacy_product p
+           SET nearest_expiration = (
+               SELECT MIN(b.expiration_date)
+                 FROM pharmacy_batch b
+                 JOIN pharmacy_inventory i ON i.batch_id = b.id
+                WHERE b.product_id = p.id AND i.quantity > 0
+           )
+         WHERE p.id = OLD.product_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER pharmacy_inventory_delete
+AFTER DELETE ON pharmacy_inventory
+FOR EACH ROW WHEN (OLD.quantity <> 0)
+EXECUTE FUNCTION pharmacy_inventory_delete_trg();
+"""
+
+DROP_INVENTORY_DELETE_TRIGGER = """
+DROP TRIGGER IF EXISTS pharmacy_inventory_delete ON pharmacy_inventory;
+DROP FUNCTION IF EXISTS pharmacy_inventory_delete_trg();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0016_supplier_inn_ogrn_bigint'),
+    ]
+
+    operations = [
+        migrations.RunSQL(MERGE_DUPLICATE_INVENTORY, migrations.RunSQL.noop),
+        migrations.AlterUniqueTogether(
+            name='inventory',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='inventory',
+            constraint=models.UniqueConstraint(fields=('warehouse', 'product', 'batch'), name='inv_wh_prod_batch_uniq', nulls_distinct=False),
+        ),
+        migrations.RunSQL(
+            STOCK_MOVEMENT_FUNCTION,
+            prices_migration.STOCK_MOVEMENT_FUNCTION_TEMPLATE.format(price_columns='', price_values=''),
+        ),
+        migrations.RunSQL(INVENTORY_DELETE_TRIGGER, DROP_INVENTORY_DELETE_TRIGGER),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.15 on 2026-10-15 01:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0017_inventory_ledger_integrity'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='inventory',
+            name='batch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.RESTRICT, to='pharmacy.batch'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.15 on 2026-10-15 02:01
+
+from django.db import migrations
+
+# Django включает sale_id в SET при каждом save(), поэтому триггер
+# UPDATE OF sale_id без условия срабатывал на любое сохранение позиции:
+# возвращённый NEW приходил с NULL в вычисляемом line_total_kopecks, и триггер
+# updated_at считал строку изменённой. Копия даты нужна только при вставке
+# и при переносе позиции в другой чек.
+SPLIT_SALE_DATE_TRIGGER = """
+DROP TRIGGER IF EXISTS pharmacy_saledetail_sale_date ON pharmacy_saledetail;
+
+CREATE TRIGGER pharmacy_saledetail_sale_date
+BEFORE INSERT ON pharmacy_saledetail
+FOR EACH ROW EXECUTE FUNCTION pharmacy_saledetail_sale_date_trg();
+
+CREATE TRIGGER pharmacy_saledetail_sale_date_move
+BEFORE UPDATE OF sale_id ON pharmacy_saledetail
+FOR EACH ROW WHEN (OLD.sale_id IS DISTINCT FROM NEW.sale_id)
+EXECUTE FUNCTION pharmacy_saledetail_sale_date_trg();
+"""
+
+MERGE_SALE_DATE_TRIGGER = """
+DROP TRIGGER IF EXISTS pharmacy_saledetail_sale_date_move ON pharmacy_saledetail;
+DROP TRIGGER IF EXISTS pharmacy_saledetail_sale_date ON pharmacy_saledetail;
+
+CREATE TRIGGER pharmacy_saledetail_sale_date
+BEFORE INSERT OR UPDATE OF sale_id ON pharmacy_saledetail
+FOR EACH ROW EXECUTE FUNCTION pharmacy_saledetail_sale_date_trg();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0018_inventory_batch_restrict'),
+    ]
+
+    operations = [
+        migrations.RunSQL(SPLIT_SALE_DATE_TRIGGER, MERGE_SALE_DATE_TRIGGER),
+    ]
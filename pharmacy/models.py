@@ -1,5 +1,19 @@
-from django.db import models
+import json
+import time
+from collections import Counter
+from decimal import ROUND_HALF_UP, Decimal
+from typing import NamedTuple
+
+from django.core.cache import cache
+from django.db import DatabaseError, IntegrityError, connection, connections, models, router, transaction
+from django.db.models import CharField, F, OuterRef, Prefetch, Q, Subquery, Value
+from django.db.models.functions import Concat
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import BrinIndex, HashIndex
+from django.utils import timezone
+
+from .fields import CaseInsensitiveCharField
+from .validators import format_inn, format_ogrn, validate_inn, validate_ogrn
 
 
 # ---------------------------------------------------------------------
@@ -9,35 +23,186 @@ from django.contrib.auth.models import User
 class TimeStampedModel(models.Model):
     """
     Абстрактная модель для автоматического заполнения дат создания и обновления.
+    updated_at выставляет триггер БД и только при реальном изменении строки
+    (см. миграцию 0006_updated_at_trigger).
+
+    Триггер создан только для таблиц, существовавших в 0006. Для новой модели-
+    наследника добавьте в её миграцию после CreateModel операцию
+    pharmacy.triggers.CreateUpdatedAtTrigger('<db_table>'), иначе updated_at
+    не будет обновляться.
     """
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    # Поля, которые ведёт сама БД (триггеры, F-выражения). Обычный save()
+    # уже существующей записи их не перезаписывает устаревшими значениями.
+    db_maintained_fields = ()
 
     class Meta:
         abstract = True
 
+    def save(self, *args, **kwargs):
+        if (
+            not self.db_maintained_fields
+            or self._state.adding
+            or kwargs.get('update_fields') is not None
+            or kwargs.get('force_insert')
+        ):
+            return super().save(*args, **kwargs)
+
+        # Только загруженные поля: отложенные (.only / .defer) не подгружаются
+        deferred = self.get_deferred_fields()
+        update_fields = [
+            field.name for field in self._meta.concrete_fields
+            if not field.primary_key
+            and not field.generated
+            and field.attname not in deferred
+            and field.name not in self.db_maintained_fields
+        ]
+        try:
+            return super().save(*args, update_fields=update_fields, **kwargs)
+        except DatabaseError as exc:
+            # "Save with update_fields did not affect any rows": строку удалили.
+            # Обычный save() вставил бы её заново с устаревшими значениями полей,
+            # которые ведёт БД (остаток мимо журнала движений и т.п.), поэтому
+            # не пересоздаём. Ошибки драйвера БД (подклассы DatabaseError) - как есть.
+            if type(exc) is not DatabaseError:
+                raise
+            raise self.DoesNotExist(
+                f"{self._meta.object_name} #{self.pk} удалён, повторно не создаётся"
+            ) from exc
+
+
+# Денежные суммы хранятся целым числом копеек (BigIntegerField, поля *_kopecks).
+# Для совместимости в моделях оставлены свойства в рублях (Decimal).
+def to_kopecks(value):
+    return int((Decimal(value) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def money_property(kopecks_field):
+    """
+    Свойство в рублях (Decimal) поверх целочисленного поля в копейках.
+    """
+    def getter(self):
+        return Decimal(getattr(self, kopecks_field)).scaleb(-2)
+
+    def setter(self, value):
+        setattr(self, kopecks_field, to_kopecks(value))
+
+    return property(getter, setter)
+
+
+def delete_with_db_cascade(instance, using=None):
+    """
+    Удалить документ одним DELETE. Строки документа удаляет сама БД
+    (ON DELETE CASCADE, миграция 0008), минуя сборщик Django с его
+    SELECT + DELETE по каждой связанной строке. Сигналы delete не отправляются.
+    """
+    model = type(instance)
+    using = using or router.db_for_write(model, instance=instance)
+    db = connections[using]
+    with db.cursor() as cursor:
+        cursor.execute(
+            'DELETE FROM {} WHERE {} = %s'.format(
+                db.ops.quote_name(model._meta.db_table),
+                db.ops.quote_name(model._meta.pk.column),
+            ),
+            [instance.pk],
+        )
+        deleted = cursor.rowcount
+    setattr(instance, model._meta.pk.attname, None)
+    return deleted, {model._meta.label: deleted}
+
+
+class InsufficientStockError(Exception):
+    """
+    Недостаточно товара на остатке для списания.
+    """
+
+
+class CartLine(NamedTuple):
+    """
+    Строка корзины для Sale.checkout(): позиция остатка, количество, скидка на единицу.
+    """
+    inventory_id: int
+    quantity: int
+    discount_kopecks: int = 0
+
+
+class DisplayQuerySet(models.QuerySet):
+    def with_display(self):
+        """
+        Подставить готовую строку __str__ из БД (аннотация _display_cache,
+        выражение - display_expression() модели): __str__ не обращается к FK.
+        """
+        return self.annotate(_display_cache=self.model.display_expression())
+
+
+class DetailManager(models.Manager.from_queryset(DisplayQuerySet)):
+    """
+    Менеджер строк документов: сразу подтягивает шапку, товар и партию
+    одним JOIN (select_related), чтобы __str__ и списки не давали N+1.
+
+    Список связей - атрибут класса (подкласс на модель), а не аргумент
+    конструктора: менеджеры связей (sale.sale_details и т.п.) Django строит
+    наследованием от менеджера модели и вызывает __init__() без аргументов.
+    """
+    related = ()
+
+    def get_queryset(self):
+        return super().get_queryset().select_related(*self.related)
+
+
+# Кэш справочников (Redis, см. CACHES в settings). Сбрасывается сигналами
+# post_save / post_delete в pharmacy/signals.py.
+REFERENCE_CACHE_TIMEOUT = 60 * 60
+
+
+def cached_lookup(key, loader):
+    """
+    Взять объект из кэша или загрузить через loader() и положить в кэш.
+    Отсутствие объекта (DoesNotExist) не кэшируется.
+    """
+    obj = cache.get(key)
+    if obj is None:
+        obj = loader()
+        cache.set(key, obj, REFERENCE_CACHE_TIMEOUT)
+    return obj
+
+
+# Статусы документов хранятся в smallint (2 байта вместо varchar),
+# сравнение в WHERE - целочисленное. Значения не перенумеровывать:
+# они записаны в БД.
 
 # Пример статусов для заказов
-class OrderStatus(models.TextChoices):
-    DRAFT = 'draft', 'Черновик'
-    SENT = 'sent', 'Отправлен'
-    RECEIVED = 'received', 'Получен'
-    CANCELLED = 'cancelled', 'Отменён'
+class OrderStatus(models.IntegerChoices):
+    DRAFT = 0, 'Черновик'
+    SENT = 1, 'Отправлен'
+    RECEIVED = 2, 'Получен'
+    CANCELLED = 3, 'Отменён'
 
 
 # Пример статусов для приёмки
-class ReceiptStatus(models.TextChoices):
-    PENDING = 'pending', 'Ожидается'
-    PARTIAL = 'partial', 'Частично принято'
-    COMPLETED = 'completed', 'Завершено'
-    REJECTED = 'rejected', 'Отклонено'
+class ReceiptStatus(models.IntegerChoices):
+    PENDING = 0, 'Ожидается'
+    PARTIAL = 1, 'Частично принято'
+    COMPLETED = 2, 'Завершено'
+    REJECTED = 3, 'Отклонено'
 
 
 # Пример статусов для продажи (чека)
-class SaleStatus(models.TextChoices):
-    OPEN = 'open', 'Открыт'
-    COMPLETED = 'completed', 'Оплачен'
-    RETURNED = 'returned', 'Возврат'
+class SaleStatus(models.IntegerChoices):
+    OPEN = 0, 'Открыт'
+    COMPLETED = 1, 'Оплачен'
+    RETURNED = 2, 'Возврат'
+
+
+# Источник движения товара (документ, породивший StockMovement)
+class MovementSource(models.TextChoices):
+    SALE = 'sale', 'Продажа'
+    RECEIPT = 'receipt', 'Приёмка'
+    WRITE_OFF = 'write_off', 'Списание'
+    ADJUSTMENT = 'adjustment', 'Корректировка'
 
 
 # ---------------------------------------------------------------------
@@ -49,10 +214,10 @@ class Product(TimeStampedModel):
     Справочник товаров (лекарственные препараты, парафармация и т.д.)
     """
     name = models.CharField(max_length=255)
-    product_code = models.CharField(
+    product_code = CaseInsensitiveCharField(
         max_length=100,
         unique=True,
-        help_text="Штрихкод, внутр. код или код маркировки"
+        help_text="Штрихкод, внутр. код или код маркировки (без учёта регистра)"
     )
     form = models.CharField(
         max_length=100,
@@ -64,10 +229,101 @@ class Product(TimeStampedModel):
     is_restricted = models.BooleanField(default=False, help_text="Рецептурный / особый контроль?")
     min_stock_level = models.PositiveIntegerField(default=0, help_text="Минимальный остаток")
     max_stock_level = models.PositiveIntegerField(default=0, help_text="Максимальный остаток")
+    retail_price_kopecks = models.BigIntegerField(default=0, help_text="Розничная цена, коп.")
+    # Денормализованные поля: ведутся триггерами БД по StockMovement / Inventory
+    # и сигналами по Batch (pharmacy/signals.py)
+    current_stock = models.PositiveIntegerField(
+        default=0,
+        db_index=True,
+        editable=False,
+        help_text="Суммарный остаток по всем складам"
+    )
+    nearest_expiration = models.DateField(
+        blank=True,
+        null=True,
+        db_index=True,
+        editable=False,
+        help_text="Ближайший срок годности среди партий в наличии"
+    )
+
+    retail_price = money_property('retail_price_kopecks')
+
+    db_maintained_fields = ('current_stock', 'nearest_expiration')
+
+    class Meta:
+        indexes = [
+            # Штрихкод ищется только на точное совпадение - hash-индекс компактнее btree
+            HashIndex(fields=['product_code'], name='prod_code_hash'),
+        ]
 
     def __str__(self):
         return self.name
 
+    @staticmethod
+    def code_cache_key(code):
+        # Код сравнивается без учёта регистра (citext) - ключ кэша тоже
+        return f'pharmacy:product:code:{code.lower()}'
+
+    @classmethod
+    def get_by_code(cls, code):
+        """
+        Товар по штрихкоду / коду (горячий путь кассы): кэш процесса, затем Redis.
+        Загружаются только поля для кассы (POS_PRODUCT_FIELDS), остальные -
+        отдельным запросом при обращении.
+        """
+        return _product_by_code(code.lower())
+
+    @classmethod
+    def refresh_nearest_expiration(cls, product_ids):
+        """
+        Пересчитать nearest_expiration по партиям, которые есть в наличии.
+        """
+        nearest = (
+            Batch.objects
+            .filter(product=OuterRef('pk'), expiration_date__isnull=False, inventory__quantity__gt=0)
+            .order_by('expiration_date')
+            .values('expiration_date')[:1]
+        )
+        cls.objects.filter(pk__in=product_ids).update(nearest_expiration=Subquery(nearest))
+
+
+# Поля товара, нужные кассе при сканировании штрихкода
+POS_PRODUCT_FIELDS = ('id', 'name', 'product_code', 'is_restricted', 'retail_price_kopecks')
+
+# Кэш процесса сбрасывается сигналами только в том процессе, где товар изменён.
+# Остальные воркеры увидят изменение не позже чем через LOCAL_CACHE_TTL секунд.
+LOCAL_CACHE_TTL = 60
+LOCAL_CACHE_MAXSIZE = 200_000
+
+# код -> (момент устаревания по time.monotonic(), значения POS_PRODUCT_FIELDS).
+# Хранятся значения, а не экземпляр: каждый вызов получает свой Product,
+# и изменения одного запроса не видны другим.
+_local_products = {}
+
+
+def _product_by_code(code):
+    now = time.monotonic()
+    entry = _local_products.get(code)
+    if entry is None or entry[0] <= now:
+        product = cached_lookup(
+            Product.code_cache_key(code),
+            lambda: Product.objects.only(*POS_PRODUCT_FIELDS).get(product_code=code),
+        )
+        if len(_local_products) >= LOCAL_CACHE_MAXSIZE:
+            _evict_local_products(now)
+        entry = (now + LOCAL_CACHE_TTL, tuple(getattr(product, field) for field in POS_PRODUCT_FIELDS))
+        _local_products[code] = entry
+    return Product.from_db(router.db_for_read(Product), POS_PRODUCT_FIELDS, entry[1])
+
+
+def _evict_local_products(now):
+    # Сначала устаревшие записи; если кэш забит живыми - сбросить целиком
+    for code, (expires_at, _) in list(_local_products.items()):
+        if expires_at <= now:
+            _local_products.pop(code, None)
+    if len(_local_products) >= LOCAL_CACHE_MAXSIZE:
+        _local_products.clear()
+
 
 class Batch(TimeStampedModel):
     """
@@ -76,9 +332,29 @@ class Batch(TimeStampedModel):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='batches')
     batch_number = models.CharField(max_length=100, blank=True)
     expiration_date = models.DateField(blank=True, null=True)
+    cost_price_kopecks = models.BigIntegerField(default=0, help_text="Закупочная цена, коп.")
+
+    cost_price = money_property('cost_price_kopecks')
+
+    class Meta:
+        indexes = [
+            # Сроки годности по товару (отчёт "истекающие партии")
+            models.Index(fields=['product', 'expiration_date'], name='batch_prod_exp'),
+            models.Index(
+                fields=['expiration_date'],
+                condition=Q(expiration_date__isnull=False),
+                name='batch_exp_notnull',
+            ),
+        ]
+
+    objects = DisplayQuerySet.as_manager()
 
     def __str__(self):
-        return f"{self.product.name} | Партия: {self.batch_number}"
+        return getattr(self, '_display_cache', None) or f"{self.product.name} | Партия: {self.batch_number}"
+
+    @staticmethod
+    def display_expression():
+        return Concat('product__name', Value(' | Партия: '), 'batch_number', output_field=CharField())
 
 
 class Warehouse(TimeStampedModel):
@@ -93,6 +369,14 @@ class Warehouse(TimeStampedModel):
     def __str__(self):
         return self.name
 
+    @staticmethod
+    def id_cache_key(pk):
+        return f'pharmacy:warehouse:{pk}'
+
+    @classmethod
+    def by_id(cls, pk):
+        return cached_lookup(cls.id_cache_key(pk), lambda: cls.objects.get(pk=pk))
+
 
 class Inventory(TimeStampedModel):
     """
@@ -100,16 +384,164 @@ class Inventory(TimeStampedModel):
     """
     warehouse = models.ForeignKey(Warehouse, on_delete=models.CASCADE, related_name='inventory')
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='inventory_items')
+    # Партию со строками остатка удалить нельзя: SET_NULL столкнулся бы со строкой
+    # без партии (inv_wh_prod_batch_uniq). RESTRICT, а не PROTECT - удаление
+    # товара каскадом удаляет и партии, и остатки.
+    batch = models.ForeignKey(Batch, on_delete=models.RESTRICT, blank=True, null=True)
+    quantity = models.PositiveIntegerField(default=0, editable=False, help_text="Остаток по журналу движений StockMovement")
+    # Цены - не у остатка: закупочная у партии (Batch.cost_price),
+    # розничная у товара (Product.retail_price)
+
+    # quantity ведёт триггер журнала StockMovement: save() его не перезаписывает
+    db_maintained_fields = ('quantity',)
+
+    class Meta:
+        constraints = [
+            # NULLS NOT DISTINCT: строка остатка без партии тоже одна на склад и товар,
+            # на это опирается INSERT ... ON CONFLICT в триггере журнала
+            models.UniqueConstraint(
+                fields=['warehouse', 'product', 'batch'],
+                nulls_distinct=False,
+                name='inv_wh_prod_batch_uniq',
+            ),
+        ]
+        indexes = [
+            # Покрывающий индекс для остатков по складу: количество
+            # читается прямо из индекса, без обращения к таблице.
+            models.Index(
+                fields=['warehouse', 'product'],
+                include=['quantity'],
+                name='inv_wh_prod_cov',
+            ),
+            models.Index(fields=['product', 'batch'], name='inv_prod_batch'),
+            models.Index(
+                fields=['quantity'],
+                condition=Q(quantity__gt=0),
+                name='inv_positive_qty',
+            ),
+        ]
+
+    objects = DisplayQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.quantity:
+            raise ValueError("Остаток создаётся и меняется только движениями StockMovement")
+        return super().save(*args, **kwargs)
+
+    def __str__(self):
+        return (
+            getattr(self, '_display_cache', None)
+            or f"{self.warehouse.name} | {self.product.name} | Остаток: {self.quantity}"
+        )
+
+    @staticmethod
+    def display_expression():
+        return Concat(
+            'warehouse__name', Value(' | '), 'product__name', Value(' | Остаток: '), 'quantity',
+            output_field=CharField(),
+        )
+
+    @classmethod
+    def decrement(cls, pk, qty, source_type=MovementSource.ADJUSTMENT, source_id=None):
+        """
+        Списать qty со строки остатка одним запросом: движение StockMovement
+        добавляется только если quantity >= qty, триггер журнала уменьшает остаток.
+        Возвращает новый остаток; при нехватке - InsufficientStockError.
+
+        FOR UPDATE в CTE блокирует только эту строку остатка на время запроса,
+        а условие quantity >= qty перепроверяется по её актуальной версии.
+        """
+        # При qty <= 0 условие quantity >= qty выполнено всегда, и "списание"
+        # записало бы приход
+        if qty <= 0:
+            raise ValueError(f"Количество для списания должно быть положительным: {qty}")
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                WITH inv AS (
+                    SELECT warehouse_id, product_id, batch_id, quantity
+                      FROM {cls._meta.db_table}
+                     WHERE id = %s AND quantity >= %s
+                       FOR UPDATE
+                )
+                INSERT INTO {StockMovement._meta.db_table}
+                    (warehouse_id, product_id, batch_id, delta, source_type, source_id, ts)
+                SELECT warehouse_id, product_id, batch_id, -%s, %s, %s, now() FROM inv
+                RETURNING (SELECT quantity FROM inv) - %s
+                """,
+                [pk, qty, qty, source_type, source_id, qty],
+            )
+            row = cursor.fetchone()
+        if row is None:
+            raise InsufficientStockError(f"Недостаточно остатка #{pk} для списания {qty} шт.")
+        return row[0]
+
+
+class StockMovement(models.Model):
+    """
+    Журнал движений товара (только добавление записей). Inventory.quantity и
+    Product.current_stock - накопительные итоги по журналу, их пересчитывает
+    триггер БД на INSERT (миграция 0012). Приход - delta > 0, расход - delta < 0.
+    """
+    warehouse = models.ForeignKey(Warehouse, on_delete=models.CASCADE, related_name='stock_movements')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_movements')
     batch = models.ForeignKey(Batch, on_delete=models.SET_NULL, blank=True, null=True)
-    quantity = models.PositiveIntegerField(default=0, help_text="Текущее количество")
-    cost_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
-    retail_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    delta = models.IntegerField(help_text="Изменение количества (+ приход, - расход)")
+    source_type = models.CharField(max_length=20, choices=MovementSource.choices)
+    source_id = models.BigIntegerField(blank=True, null=True, help_text="id документа-источника")
+    ts = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [
+            # Журнал пишется по времени - BRIN по ts крошечный и хорошо отсекает периоды
+            BrinIndex(fields=['ts'], name='stockmove_ts_brin'),
+            models.Index(fields=['warehouse', 'product', 'batch'], name='stockmove_wh_prod_batch'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_source_type_display()} #{self.source_id}: {self.delta:+d}"
+
+
+class InventorySnapshot(models.Model):
+    """
+    Денормализованный срез остатков (materialized view pharmacy_inventory_mv).
+    Остаток + товар + партия + склад одной строкой, без JOIN-ов при чтении.
+    Данные обновляются командой ``manage.py pharmacy_mv --refresh``.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    warehouse = models.ForeignKey(Warehouse, on_delete=models.DO_NOTHING, related_name='+')
+    warehouse_name = models.CharField(max_length=255)
+    product = models.ForeignKey(Product, on_delete=models.DO_NOTHING, related_name='+')
+    product_name = models.CharField(max_length=255)
+    product_code = models.CharField(max_length=100)
+    batch = models.ForeignKey(Batch, on_delete=models.DO_NOTHING, blank=True, null=True, related_name='+')
+    batch_number = models.CharField(max_length=100, blank=True, null=True)
+    expiration_date = models.DateField(blank=True, null=True)
+    quantity = models.PositiveIntegerField()
+    cost_price_kopecks = models.BigIntegerField()
+    retail_price_kopecks = models.BigIntegerField()
+
+    cost_price = money_property('cost_price_kopecks')
+    retail_price = money_property('retail_price_kopecks')
 
     class Meta:
-        unique_together = ('warehouse', 'product', 'batch')
+        managed = False
+        db_table = 'pharmacy_inventory_mv'
 
     def __str__(self):
-        return f"{self.warehouse.name} | {self.product.name} | Остаток: {self.quantity}"
+        return f"{self.warehouse_name} | {self.product_name} | Остаток: {self.quantity}"
+
+    @classmethod
+    def refresh(cls, concurrently=True):
+        """
+        Пересчитать витрину. CONCURRENTLY не блокирует чтение (нужен уникальный индекс по id).
+        """
+        sql = 'REFRESH MATERIALIZED VIEW {}{}'.format(
+            'CONCURRENTLY ' if concurrently else '',
+            connection.ops.quote_name(cls._meta.db_table),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
 
 
 # ---------------------------------------------------------------------
@@ -123,12 +555,40 @@ class Supplier(TimeStampedModel):
     name = models.CharField(max_length=255)
     contact_info = models.CharField(max_length=255, blank=True)
     address = models.CharField(max_length=255, blank=True)
-    inn = models.CharField(max_length=20, blank=True, verbose_name="ИНН")
-    ogrn = models.CharField(max_length=20, blank=True, verbose_name="ОГРН")
+    # Хранятся числом; для вывода - inn_display / ogrn_display (с ведущими нулями)
+    inn = models.BigIntegerField(blank=True, null=True, validators=[validate_inn], verbose_name="ИНН")
+    ogrn = models.BigIntegerField(blank=True, null=True, validators=[validate_ogrn], verbose_name="ОГРН")
+
+    class Meta:
+        constraints = [
+            # 10 или 12 цифр, первая может быть нулём
+            models.CheckConstraint(condition=Q(inn__range=(10 ** 8, 10 ** 12 - 1)), name='supplier_inn_range'),
+            # ОГРН - 13 цифр, ОГРНИП - 15
+            models.CheckConstraint(
+                condition=Q(ogrn__range=(10 ** 12, 10 ** 13 - 1)) | Q(ogrn__range=(10 ** 14, 10 ** 15 - 1)),
+                name='supplier_ogrn_range',
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def inn_display(self):
+        return format_inn(self.inn)
+
+    @property
+    def ogrn_display(self):
+        return format_ogrn(self.ogrn)
+
+    @staticmethod
+    def id_cache_key(pk):
+        return f'pharmacy:supplier:{pk}'
+
+    @classmethod
+    def by_id(cls, pk):
+        return cached_lookup(cls.id_cache_key(pk), lambda: cls.objects.get(pk=pk))
+
 
 class PurchaseOrder(TimeStampedModel):
     """
@@ -137,38 +597,72 @@ class PurchaseOrder(TimeStampedModel):
     supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE, related_name='purchase_orders')
     warehouse = models.ForeignKey(Warehouse, on_delete=models.CASCADE, related_name='purchase_orders')
     order_date = models.DateTimeField(auto_now_add=True)
-    status = models.CharField(
-        max_length=20,
+    status = models.PositiveSmallIntegerField(
         choices=OrderStatus.choices,
         default=OrderStatus.DRAFT
     )
-    total_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_cost_kopecks = models.BigIntegerField(
+        default=0,
+        editable=False,
+        help_text="Сумма заказа, коп. Пересчитывается триггером БД по строкам заказа"
+    )
+
+    total_cost = money_property('total_cost_kopecks')
+
+    db_maintained_fields = ('total_cost_kopecks',)
+
+    class Meta:
+        indexes = [
+            BrinIndex(fields=['order_date'], pages_per_range=32, name='purchaseorder_date_brin'),
+        ]
 
     def __str__(self):
         return f"Заказ #{self.id} от {self.order_date.date()}"
 
+    def delete(self, using=None, keep_parents=False):
+        return delete_with_db_cascade(self, using)
+
+
+class PurchaseOrderDetailManager(DetailManager):
+    related = ('purchase_order', 'product')
+
 
 class PurchaseOrderDetail(TimeStampedModel):
     """
     Детали заказа поставщику (строки).
     """
+    # Каскадное удаление выполняет БД (ON DELETE CASCADE), см. delete_with_db_cascade()
     purchase_order = models.ForeignKey(
         PurchaseOrder,
-        on_delete=models.CASCADE,
+        on_delete=models.DO_NOTHING,
         related_name='order_details'
     )
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField(default=0)
-    price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
-    discount = models.DecimalField(
-        max_digits=6,
-        decimal_places=2,
-        default=0,
-        help_text="Скидка, если есть"
+    price_kopecks = models.BigIntegerField(default=0, help_text="Цена, коп.")
+    discount_kopecks = models.BigIntegerField(default=0, help_text="Скидка на единицу, коп., если есть")
+    line_total_kopecks = models.GeneratedField(
+        expression=F('quantity') * (F('price_kopecks') - F('discount_kopecks')),
+        output_field=models.BigIntegerField(),
+        db_persist=True,
+        help_text="Сумма строки, коп. (вычисляется БД)"
     )
 
+    price = money_property('price_kopecks')
+    discount = money_property('discount_kopecks')
+    line_total = money_property('line_total_kopecks')
+
+    objects = PurchaseOrderDetailManager()
+
     def __str__(self):
-        return f"Товар: {self.product.name}, Кол-во: {self.quantity}"
+        return getattr(self, '_display_cache', None) or f"Товар: {self.product.name}, Кол-во: {self.quantity}"
+
+    @staticmethod
+    def display_expression():
+        return Concat(
+            Value('Товар: '), 'product__name', Value(', Кол-во: '), 'quantity',
+            output_field=CharField(),
+        )
 
 
 # ---------------------------------------------------------------------
@@ -179,41 +673,77 @@ class GoodsReceipt(TimeStampedModel):
     """
     Документ приёмки товаров по заказу или без него.
     """
+    # ON DELETE SET NULL на стороне БД
     purchase_order = models.ForeignKey(
         PurchaseOrder,
-        on_delete=models.SET_NULL,
+        on_delete=models.DO_NOTHING,
         blank=True, null=True,
         related_name='goods_receipts'
     )
     warehouse = models.ForeignKey(Warehouse, on_delete=models.CASCADE, related_name='goods_receipts')
     receipt_date = models.DateTimeField(auto_now_add=True)
-    status = models.CharField(
-        max_length=20,
+    status = models.PositiveSmallIntegerField(
         choices=ReceiptStatus.choices,
         default=ReceiptStatus.PENDING
     )
 
+    class Meta:
+        indexes = [
+            BrinIndex(fields=['receipt_date'], pages_per_range=32, name='goodsreceipt_date_brin'),
+        ]
+
     def __str__(self):
         return f"Приёмка #{self.id} от {self.receipt_date.date()}"
 
+    def delete(self, using=None, keep_parents=False):
+        return delete_with_db_cascade(self, using)
+
+
+class GoodsReceiptDetailManager(DetailManager):
+    related = ('goods_receipt', 'product', 'batch__product')
+
 
 class GoodsReceiptDetail(TimeStampedModel):
     """
     Детали приёмки (полученные товары и их партии).
     """
+    # Каскадное удаление выполняет БД (ON DELETE CASCADE)
     goods_receipt = models.ForeignKey(
         GoodsReceipt,
-        on_delete=models.CASCADE,
+        on_delete=models.DO_NOTHING,
         related_name='receipt_details'
     )
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     batch = models.ForeignKey(Batch, on_delete=models.SET_NULL, blank=True, null=True)
     quantity = models.PositiveIntegerField(default=0)
-    cost_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    cost_price_kopecks = models.BigIntegerField(default=0, help_text="Закупочная цена, коп.")
     expiration_date = models.DateField(blank=True, null=True)
+    line_total_kopecks = models.GeneratedField(
+        expression=F('quantity') * F('cost_price_kopecks'),
+        output_field=models.BigIntegerField(),
+        db_persist=True,
+        help_text="Сумма строки, коп. (вычисляется БД)"
+    )
+
+    cost_price = money_property('cost_price_kopecks')
+    line_total = money_property('line_total_kopecks')
+
+    objects = GoodsReceiptDetailManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['product', 'batch'], name='receiptdetail_prod_batch'),
+        ]
 
     def __str__(self):
-        return f"Приёмка #{self.goods_receipt.id}: {self.product.name}"
+        return getattr(self, '_display_cache', None) or f"Приёмка #{self.goods_receipt_id}: {self.product.name}"
+
+    @staticmethod
+    def display_expression():
+        return Concat(
+            Value('Приёмка #'), 'goods_receipt_id', Value(': '), 'product__name',
+            output_field=CharField(),
+        )
 
 
 # ---------------------------------------------------------------------
@@ -234,6 +764,35 @@ class Customer(TimeStampedModel):
         return f"{self.name} {self.surname}"
 
 
+# Колонки позиции чека, нужные для списков и печати чека
+SALE_DETAIL_LIST_FIELDS = (
+    'id', 'sale_id', 'product_id', 'batch_id', 'quantity',
+    'unit_price_kopecks', 'discount_kopecks', 'line_total_kopecks',
+)
+
+
+class SaleQuerySet(models.QuerySet):
+    def with_details(self):
+        """
+        Чеки вместе с позициями (товар и партия подтянуты) - два запроса на весь список.
+        Из позиций, товара и партии выбираются только колонки для вывода чека.
+        """
+        return self.prefetch_related(
+            Prefetch(
+                'sale_details',
+                queryset=(
+                    SaleDetail.objects
+                    .select_related(None)
+                    .select_related('product', 'batch__product')
+                    .only(
+                        *SALE_DETAIL_LIST_FIELDS, 'product__name',
+                        'batch__batch_number', 'batch__expiration_date', 'batch__product__name',
+                    )
+                ),
+            )
+        )
+
+
 class Sale(TimeStampedModel):
     """
     Шапка (чек) продажи.
@@ -242,35 +801,204 @@ class Sale(TimeStampedModel):
     cashier = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True)
     customer = models.ForeignKey(Customer, on_delete=models.SET_NULL, blank=True, null=True)
     sale_date = models.DateTimeField(auto_now_add=True)
-    status = models.CharField(
-        max_length=20,
+    status = models.PositiveSmallIntegerField(
         choices=SaleStatus.choices,
         default=SaleStatus.OPEN
     )
-    total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_amount_kopecks = models.BigIntegerField(
+        default=0,
+        editable=False,
+        help_text="Сумма чека, коп. Пересчитывается триггером БД по позициям чека"
+    )
     payment_type = models.CharField(
         max_length=50,
         default='cash',
         help_text="наличные / карта / смешанная и т.д."
     )
 
+    total_amount = money_property('total_amount_kopecks')
+
+    objects = SaleQuerySet.as_manager()
+
+    db_maintained_fields = ('total_amount_kopecks',)
+
+    class Meta:
+        indexes = [
+            # Даты документов растут вместе с id (auto_now_add): BRIN в разы меньше
+            # btree и так же отсекает диапазон "продажи за период"
+            BrinIndex(fields=['sale_date'], pages_per_range=32, name='sale_date_brin'),
+        ]
+
     def __str__(self):
         return f"Продажа #{self.id} от {self.sale_date}"
 
+    def delete(self, using=None, keep_parents=False):
+        return delete_with_db_cascade(self, using)
+
+    @classmethod
+    def fetch_with_details(cls, pk):
+        """
+        Чек со всеми позициями одной строкой (для печати / API): dict с полями
+        шапки и списком details, собранным в БД через jsonb_agg. Без Prefetch
+        и без создания модели на каждую позицию.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT s.*,
+                       COALESCE(
+                           jsonb_agg(
+                               to_jsonb(sd) || jsonb_build_object(
+                                   'product_name', p.name,
+                                   'batch_number', b.batch_number
+                               )
+                               ORDER BY sd.id
+                           ) FILTER (WHERE sd.id IS NOT NULL),
+                           '[]'
+                       ) AS details
+                  FROM {cls._meta.db_table} s
+                  LEFT JOIN {SaleDetail._meta.db_table} sd ON sd.sale_id = s.id
+                  LEFT JOIN {Product._meta.db_table} p ON p.id = sd.product_id
+                  LEFT JOIN {Batch._meta.db_table} b ON b.id = sd.batch_id
+                 WHERE s.id = %s
+                 GROUP BY s.id
+                """,
+                [pk],
+            )
+            row = cursor.fetchone()
+            if row is None:
+                raise cls.DoesNotExist(f"Чек #{pk} не найден")
+            columns = [col.name for col in cursor.description]
+        sale = dict(zip(columns, row))
+        # Django отдаёт jsonb из курсора строкой (разбор - на стороне JSONField)
+        sale['details'] = json.loads(sale['details'])
+        return sale
+
+    @classmethod
+    def checkout(cls, warehouse, cart, cashier=None, customer=None, payment_type='cash'):
+        """
+        Провести чек пакетно: позиции и движения склада (StockMovement) -
+        по одному bulk_create, вместо INSERT + UPDATE остатка на каждую строку.
+        Остатки и Product.current_stock пересчитывает триггер журнала движений.
+
+        cart - итерируемое из CartLine (или кортежей того же вида).
+        Цена берётся из товара (Product.retail_price). При нехватке товара -
+        InsufficientStockError, при количестве <= 0 - ValueError; чек не создаётся.
+        """
+        lines = [CartLine(*line) for line in cart]
+        invalid = [line for line in lines if line.quantity <= 0]
+        if invalid:
+            raise ValueError(f"Количество в позициях чека должно быть положительным: {invalid}")
+        to_write_off = Counter()
+        for line in lines:
+            to_write_off[line.inventory_id] += line.quantity
+
+        with transaction.atomic():
+            inventories = (
+                Inventory.objects
+                .filter(warehouse=warehouse, pk__in=to_write_off)
+                .select_related('product')
+                .only('id', 'product_id', 'batch_id', 'quantity', 'product__retail_price_kopecks')
+                .in_bulk()
+            )
+            missing = set(to_write_off) - set(inventories)
+            if missing:
+                raise Inventory.DoesNotExist(f"Нет остатков {sorted(missing)} на складе {warehouse}")
+            if any(inventories[pk].quantity < quantity for pk, quantity in to_write_off.items()):
+                raise InsufficientStockError(f"Недостаточно остатка для продажи на складе {warehouse}")
+
+            sale = cls.objects.create(
+                warehouse=warehouse,
+                cashier=cashier,
+                customer=customer,
+                payment_type=payment_type,
+            )
+            details = [
+                SaleDetail(
+                    sale=sale,
+                    product_id=inventories[line.inventory_id].product_id,
+                    batch_id=inventories[line.inventory_id].batch_id,
+                    quantity=line.quantity,
+                    unit_price_kopecks=inventories[line.inventory_id].product.retail_price_kopecks,
+                    discount_kopecks=line.discount_kopecks,
+                )
+                for line in lines
+            ]
+            SaleDetail.objects.bulk_create(details, batch_size=500)
+
+            # Одно движение на строку остатка (повторы в корзине сложены) и в
+            # порядке pk: параллельные чеки блокируют строки Inventory в одном
+            # порядке и не встают во взаимную блокировку
+            movements = [
+                StockMovement(
+                    warehouse=warehouse,
+                    product_id=inventories[pk].product_id,
+                    batch_id=inventories[pk].batch_id,
+                    delta=-quantity,
+                    source_type=MovementSource.SALE,
+                    source_id=sale.pk,
+                )
+                for pk, quantity in sorted(to_write_off.items())
+            ]
+            try:
+                # Параллельная продажа могла успеть списать остаток: CHECK (quantity >= 0)
+                # в pharmacy_inventory не даст уйти в минус
+                with transaction.atomic():
+                    StockMovement.objects.bulk_create(movements, batch_size=500)
+            except IntegrityError as exc:
+                raise InsufficientStockError(f"Недостаточно остатка для продажи на складе {warehouse}") from exc
+
+        # Итог в БД уже посчитал триггер; синхронизируем экземпляр без лишнего запроса
+        sale.total_amount_kopecks = sum(
+            detail.quantity * (detail.unit_price_kopecks - detail.discount_kopecks) for detail in details
+        )
+        return sale
+
+
+class SaleDetailManager(DetailManager):
+    related = ('sale', 'product', 'batch__product')
+
 
 class SaleDetail(TimeStampedModel):
     """
     Позиции в чеке продажи.
     """
-    sale = models.ForeignKey(Sale, on_delete=models.CASCADE, related_name='sale_details')
+    # Каскадное удаление выполняет БД (ON DELETE CASCADE)
+    sale = models.ForeignKey(Sale, on_delete=models.DO_NOTHING, related_name='sale_details')
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     batch = models.ForeignKey(Batch, on_delete=models.SET_NULL, blank=True, null=True)
     quantity = models.PositiveIntegerField(default=1)
-    unit_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
-    discount = models.DecimalField(max_digits=6, decimal_places=2, default=0)
+    unit_price_kopecks = models.BigIntegerField(default=0, help_text="Цена, коп.")
+    discount_kopecks = models.BigIntegerField(default=0, help_text="Скидка на единицу, коп.")
+    line_total_kopecks = models.GeneratedField(
+        expression=F('quantity') * (F('unit_price_kopecks') - F('discount_kopecks')),
+        output_field=models.BigIntegerField(),
+        db_persist=True,
+        help_text="Сумма позиции, коп. (вычисляется БД)"
+    )
+    # Копия Sale.sale_date для отчётов по периоду без JOIN с чеком; ведётся триггером БД
+    sale_date = models.DateTimeField(null=True, blank=True, editable=False)
+
+    unit_price = money_property('unit_price_kopecks')
+    discount = money_property('discount_kopecks')
+    line_total = money_property('line_total_kopecks')
+
+    objects = SaleDetailManager()
+
+    db_maintained_fields = ('sale_date',)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['product', 'batch'], name='saledetail_prod_batch'),
+            BrinIndex(fields=['sale_date'], pages_per_range=32, name='saledetail_date_brin'),
+        ]
 
     def __str__(self):
-        return f"Продажа #{self.sale.id}: {self.product.name}"
+        return getattr(self, '_display_cache', None) or f"Продажа #{self.sale_id}: {self.product.name}"
+
+    @staticmethod
+    def display_expression():
+        return Concat(Value('Продажа #'), 'sale_id', Value(': '), 'product__name', output_field=CharField())
 
 
 # ---------------------------------------------------------------------
@@ -287,5 +1015,17 @@ class WriteOff(TimeStampedModel):
     quantity = models.PositiveIntegerField(default=0)
     reason = models.CharField(max_length=255, blank=True, help_text="Причина списания (просрочка, брак и т.д.)")
 
+    objects = DisplayQuerySet.as_manager()
+
     def __str__(self):
-        return f"Списание #{self.id}: {self.product.name} - {self.quantity} шт."
+        return (
+            getattr(self, '_display_cache', None)
+            or f"Списание #{self.id}: {self.product.name} - {self.quantity} шт."
+        )
+
+    @staticmethod
+    def display_expression():
+        return Concat(
+            Value('Списание #'), 'id', Value(': '), 'product__name', Value(' - '), 'quantity', Value(' шт.'),
+            output_field=CharField(),
+        )
@@ -0,0 +1,66 @@
+import logging
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .models import Batch, Product, Supplier, Warehouse, _local_products
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------
+# Денормализованные остатки товара (Product.current_stock / nearest_expiration).
+# Изменения остатков ведут триггеры БД (журнал StockMovement, удаление Inventory),
+# здесь - только смена партии (срок годности)
+# ---------------------------------------------------------------------
+
+@receiver(post_save, sender=Batch)
+@receiver(post_delete, sender=Batch)
+def update_expiration_on_batch_change(sender, instance, **kwargs):
+    Product.refresh_nearest_expiration([instance.product_id])
+
+
+# ---------------------------------------------------------------------
+# Сброс кэша справочников (Product.get_by_code, Warehouse.by_id, Supplier.by_id)
+# ---------------------------------------------------------------------
+
+def invalidate_on_commit(keys, clear_local=False):
+    """
+    Сбросить ключи кэша после фиксации транзакции: до COMMIT другой запрос
+    успел бы заново положить в кэш старые данные. Недоступность Redis не
+    должна ломать сохранение - ошибка только пишется в лог, запись в кэше
+    доживёт до REFERENCE_CACHE_TIMEOUT.
+    """
+    def invalidate():
+        if clear_local:
+            _local_products.clear()
+        try:
+            cache.delete_many(keys)
+        except Exception:
+            logger.warning("Не удалось сбросить кэш %s", keys, exc_info=True)
+
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_init, sender=Product)
+def remember_product_code(sender, instance, **kwargs):
+    instance._cached_code = instance.__dict__.get('product_code')
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_cache(sender, instance, **kwargs):
+    # Старый код тоже сбрасываем: штрихкод мог быть изменён
+    codes = {instance._cached_code, instance.product_code} - {None}
+    invalidate_on_commit([Product.code_cache_key(code) for code in codes], clear_local=True)
+    instance._cached_code = instance.product_code
+
+
+@receiver(post_save, sender=Warehouse)
+@receiver(post_delete, sender=Warehouse)
+@receiver(post_save, sender=Supplier)
+@receiver(post_delete, sender=Supplier)
+def invalidate_reference_cache(sender, instance, **kwargs):
+    invalidate_on_commit([sender.id_cache_key(instance.pk)])
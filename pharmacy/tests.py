@@ -1,3 +1,283 @@
-from django.test import TestCase
+from datetime import date
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import RestrictedError
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from .models import (
+    Batch,
+    CartLine,
+    Inventory,
+    InsufficientStockError,
+    MovementSource,
+    Product,
+    Sale,
+    SaleDetail,
+    StockMovement,
+    Supplier,
+    Warehouse,
+)
+from .validators import format_inn, format_ogrn, validate_inn, validate_ogrn
+
+
+class StockTestMixin:
+    """
+    Склад, товар с розничной ценой и две партии. Остаток заводится только
+    движениями StockMovement (как приёмка) - строки Inventory создаёт триггер.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.warehouse = Warehouse.objects.create(name="Аптека №1")
+        cls.product = Product.objects.create(name="Аспирин", product_code="4600000000001", retail_price_kopecks=15000)
+        cls.batch_a = Batch.objects.create(product=cls.product, batch_number="A", expiration_date=date(2030, 1, 1))
+        cls.batch_b = Batch.objects.create(product=cls.product, batch_number="B", expiration_date=date(2031, 1, 1))
+        cls.inv_a = cls.receive(cls.batch_a, 10)
+        cls.inv_b = cls.receive(cls.batch_b, 5)
+
+    @classmethod
+    def receive(cls, batch, quantity):
+        StockMovement.objects.create(
+            warehouse=cls.warehouse,
+            product=cls.product,
+            batch=batch,
+            delta=quantity,
+            source_type=MovementSource.RECEIPT,
+        )
+        return Inventory.objects.get(warehouse=cls.warehouse, batch=batch)
+
+    def assertQuantity(self, inventory, expected):
+        inventory.refresh_from_db(fields=['quantity'])
+        self.assertEqual(inventory.quantity, expected)
+
+    def assertCurrentStock(self, expected):
+        self.product.refresh_from_db(fields=['current_stock'])
+        self.assertEqual(self.product.current_stock, expected)
+
+
+class CheckoutTests(StockTestMixin, TestCase):
+
+    def test_checkout_writes_off_stock(self):
+        sale = Sale.checkout(self.warehouse, [CartLine(self.inv_a.pk, 3), CartLine(self.inv_b.pk, 2)])
+
+        self.assertQuantity(self.inv_a, 7)
+        self.assertQuantity(self.inv_b, 3)
+        self.assertCurrentStock(10)
+        self.assertEqual(sale.sale_details.count(), 2)
+        movements = StockMovement.objects.filter(source_type=MovementSource.SALE, source_id=sale.pk)
+        self.assertEqual(sorted(movements.values_list('batch_id', 'delta')), [
+            (self.batch_a.pk, -3),
+            (self.batch_b.pk, -2),
+        ])
+
+    def test_checkout_short_stock(self):
+        with self.assertRaises(InsufficientStockError):
+            Sale.checkout(self.warehouse, [CartLine(self.inv_a.pk, 3), CartLine(self.inv_b.pk, 6)])
+
+        self.assertFalse(Sale.objects.exists())
+        self.assertQuantity(self.inv_a, 10)
+        self.assertQuantity(self.inv_b, 5)
+        self.assertCurrentStock(15)
+
+    def test_checkout_duplicate_lines(self):
+        # Повторы одной строки остатка складываются: 6 + 6 > 10
+        with self.assertRaises(InsufficientStockError):
+            Sale.checkout(self.warehouse, [CartLine(self.inv_a.pk, 6), CartLine(self.inv_a.pk, 6)])
+
+        sale = Sale.checkout(self.warehouse, [CartLine(self.inv_a.pk, 4), CartLine(self.inv_a.pk, 5)])
+
+        self.assertQuantity(self.inv_a, 1)
+        self.assertEqual(sale.sale_details.count(), 2)
+        movements = StockMovement.objects.filter(source_type=MovementSource.SALE, source_id=sale.pk)
+        self.assertEqual(list(movements.values_list('batch_id', 'delta')), [(self.batch_a.pk, -9)])
+
+    def test_checkout_non_positive_quantity(self):
+        for quantity in (0, -1):
+            with self.subTest(quantity=quantity), self.assertRaises(ValueError):
+                Sale.checkout(self.warehouse, [CartLine(self.inv_a.pk, 1), CartLine(self.inv_b.pk, quantity)])
+
+        self.assertFalse(Sale.objects.exists())
+        self.assertFalse(StockMovement.objects.filter(source_type=MovementSource.SALE).exists())
+        self.assertQuantity(self.inv_a, 10)
+
+    def test_checkout_total_from_trigger(self):
+        sale = Sale.checkout(self.warehouse, [
+            CartLine(self.inv_a.pk, 2, discount_kopecks=1000),
+            CartLine(self.inv_b.pk, 1),
+        ])
+        expected = 2 * (15000 - 1000) + 15000
+
+        self.assertEqual(sale.total_amount_kopecks, expected)
+        sale.refresh_from_db(fields=['total_amount_kopecks'])
+        self.assertEqual(sale.total_amount_kopecks, expected)
+        self.assertEqual(
+            sorted(SaleDetail.objects.filter(sale=sale).values_list('line_total_kopecks', flat=True)),
+            [15000, 28000],
+        )
+
+
+class DecrementTests(StockTestMixin, TestCase):
+
+    def test_decrement_returns_new_quantity(self):
+        self.assertEqual(Inventory.decrement(self.inv_a.pk, 4), 6)
+        self.assertEqual(Inventory.decrement(self.inv_a.pk, 6), 0)
+
+        self.assertQuantity(self.inv_a, 0)
+        self.assertCurrentStock(5)
+        movement = StockMovement.objects.latest('pk')
+        self.assertEqual((movement.batch_id, movement.delta), (self.batch_a.pk, -6))
+        self.assertEqual(movement.source_type, MovementSource.ADJUSTMENT)
+
+    def test_decrement_source(self):
+        Inventory.decrement(self.inv_b.pk, 1, source_type=MovementSource.WRITE_OFF, source_id=42)
+
+        movement = StockMovement.objects.latest('pk')
+        self.assertEqual((movement.source_type, movement.source_id), (MovementSource.WRITE_OFF, 42))
+
+    def test_decrement_insufficient_stock(self):
+        # Условие quantity >= qty: движение не пишется, остаток не меняется
+        movements = StockMovement.objects.count()
+        with self.assertRaises(InsufficientStockError):
+            Inventory.decrement(self.inv_b.pk, 6)
+
+        self.assertQuantity(self.inv_b, 5)
+        self.assertCurrentStock(15)
+        self.assertEqual(StockMovement.objects.count(), movements)
+
+    def test_decrement_missing_row(self):
+        with self.assertRaises(InsufficientStockError):
+            Inventory.decrement(0, 1)
+
+    def test_decrement_non_positive_qty(self):
+        movements = StockMovement.objects.count()
+        for qty in (0, -5):
+            with self.subTest(qty=qty), self.assertRaises(ValueError):
+                Inventory.decrement(self.inv_a.pk, qty)
+
+        self.assertQuantity(self.inv_a, 10)
+        self.assertEqual(StockMovement.objects.count(), movements)
+
+
+class DeletedRowSaveTests(StockTestMixin, TestCase):
+
+    def test_deleted_inventory_is_not_recreated(self):
+        inventory = Inventory.objects.get(pk=self.inv_a.pk)
+        Inventory.objects.filter(pk=inventory.pk).delete()
+
+        with self.assertRaises(Inventory.DoesNotExist), transaction.atomic():
+            inventory.save()
+
+        self.assertFalse(Inventory.objects.filter(pk=inventory.pk).exists())
+        self.assertCurrentStock(5)
+
+    def test_deleted_row_without_db_fields_is_recreated(self):
+        # Обычная модель ведёт себя как в Django: save() вставляет строку заново
+        warehouse = Warehouse.objects.create(name="Склад")
+        Warehouse.objects.filter(pk=warehouse.pk).delete()
+
+        warehouse.save()
+
+        self.assertTrue(Warehouse.objects.filter(pk=warehouse.pk).exists())
+
+
+class BatchDeleteTests(StockTestMixin, TestCase):
+
+    def test_batch_with_stock_rows_is_restricted(self):
+        # Остаток без партии уже есть: SET_NULL дал бы дубль (склад, товар, NULL)
+        self.receive(None, 3)
+        with self.assertRaises(RestrictedError):
+            self.batch_b.delete()
+
+        self.assertQuantity(self.inv_b, 5)
+        self.assertCurrentStock(18)
+
+    def test_batch_without_stock_rows(self):
+        batch = Batch.objects.create(product=self.product, batch_number="C")
+        batch.delete()
+
+        self.assertFalse(Batch.objects.filter(pk=batch.pk).exists())
+
+    def test_product_delete_cascades_batches_and_stock(self):
+        self.product.delete()
+
+        self.assertFalse(Batch.objects.exists())
+        self.assertFalse(Inventory.objects.exists())
+
+
+class SaleDetailSaveTests(StockTestMixin, TestCase):
+
+    def test_noop_save_keeps_updated_at(self):
+        # Триггеры БД (sale_date, updated_at) не должны считать неизменённую строку изменённой
+        sale = Sale.checkout(self.warehouse, [CartLine(self.inv_a.pk, 2)])
+        detail = SaleDetail.objects.get(sale=sale)
+
+        detail.save()
+
+        refreshed = SaleDetail.objects.get(pk=detail.pk)
+        self.assertEqual(refreshed.updated_at, detail.updated_at)
+        self.assertEqual(refreshed.sale_date, sale.sale_date)
+        self.assertEqual(refreshed.line_total_kopecks, 2 * 15000)
+
+    def test_move_to_other_sale_copies_sale_date(self):
+        sale = Sale.checkout(self.warehouse, [CartLine(self.inv_a.pk, 2)])
+        other = Sale.objects.create(warehouse=self.warehouse)
+        Sale.objects.filter(pk=other.pk).update(sale_date=date(2024, 1, 1))
+        detail = SaleDetail.objects.get(sale=sale)
+
+        detail.sale_id = other.pk
+        detail.save()
+
+        other.refresh_from_db(fields=['sale_date'])
+        detail.refresh_from_db(fields=['sale_date'])
+        self.assertEqual(detail.sale_date, other.sale_date)
+
+
+class InnOgrnValidatorTests(SimpleTestCase):
+
+    def test_inn_valid(self):
+        for value in (7707083893, 500100732259):
+            with self.subTest(value=value):
+                validate_inn(value)
+
+    def test_inn_leading_zero(self):
+        # Ведущий ноль (регион 01) теряется в bigint и восстанавливается при выводе
+        self.assertEqual(format_inn(105012349), '0105012349')
+        self.assertEqual(format_inn(10501234581), '010501234581')
+        validate_inn(105012349)
+        validate_inn(10501234581)
+        self.assertEqual(Supplier(inn=105012349).inn_display, '0105012349')
+
+    def test_inn_invalid(self):
+        # Неверная контрольная цифра (10 и 12 цифр); слишком короткие значения,
+        # у которых контрольная цифра после дополнения нулями сходится
+        for value in (7707083894, 500100732258, 0, 18):
+            with self.subTest(value=value), self.assertRaises(ValidationError):
+                validate_inn(value)
+
+    def test_ogrn_valid(self):
+        for value in (1027700132195, 304500116000157):
+            with self.subTest(value=value):
+                validate_ogrn(value)
+        self.assertEqual(format_ogrn(1027700132195), '1027700132195')
+        self.assertEqual(format_ogrn(None), '')
+
+    def test_ogrn_invalid(self):
+        # Неверная контрольная цифра ОГРН / ОГРНИП и 14 цифр
+        for value in (1027700132196, 304500116000158, 10277001321950):
+            with self.subTest(value=value), self.assertRaises(ValidationError):
+                validate_ogrn(value)
+
+
+class SupplierAdminTests(TestCase):
+
+    def test_changelist_shows_inn_with_leading_zero(self):
+        Supplier.objects.create(name="ООО Ромашка", inn=105012349, ogrn=1027700132195)
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "admin"))
+
+        response = self.client.get(reverse('admin:pharmacy_supplier_changelist'))
+
+        self.assertContains(response, '0105012349')
+        self.assertContains(response, '1027700132195')
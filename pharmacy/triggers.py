@@ -0,0 +1,45 @@
+"""
+SQL для триггера updated_at (функция pharmacy_set_updated_at из миграции 0006).
+Используется миграциями: новая модель-наследник TimeStampedModel получает
+триггер операцией CreateUpdatedAtTrigger, массовые UPDATE данных
+выполняются через without_updated_at_triggers.
+"""
+from django.db import migrations
+
+
+def create_updated_at_trigger_sql(table):
+    # Триггер срабатывает только если строка действительно изменилась
+    return (
+        f'CREATE TRIGGER "{table}_set_updated_at" BEFORE UPDATE ON "{table}" '
+        f'FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*) '
+        f'EXECUTE FUNCTION pharmacy_set_updated_at();'
+    )
+
+
+def drop_updated_at_trigger_sql(table):
+    return f'DROP TRIGGER IF EXISTS "{table}_set_updated_at" ON "{table}";'
+
+
+class CreateUpdatedAtTrigger(migrations.RunSQL):
+    """
+    Операция миграции: триггер updated_at для таблицы новой модели.
+    Ставится после CreateModel, например CreateUpdatedAtTrigger('pharmacy_foo').
+    """
+    def __init__(self, table):
+        self.table = table
+        super().__init__(create_updated_at_trigger_sql(table), drop_updated_at_trigger_sql(table))
+
+    def describe(self):
+        return f"Create updated_at trigger on {self.table}"
+
+
+def without_updated_at_triggers(sql, tables):
+    """
+    Обернуть массовое изменение данных (backfill, конвертацию) так, чтобы
+    оно не сдвигало updated_at: история изменений записей сохраняется.
+    SET CONSTRAINTS ALL IMMEDIATE - иначе отложенные проверки FK после UPDATE
+    не дают выполнить ALTER TABLE в той же транзакции.
+    """
+    disable = '\n'.join(f'ALTER TABLE "{table}" DISABLE TRIGGER "{table}_set_updated_at";' for table in tables)
+    enable = '\n'.join(f'ALTER TABLE "{table}" ENABLE TRIGGER "{table}_set_updated_at";' for table in tables)
+    return f'{disable}\n{sql}\nSET CONSTRAINTS ALL IMMEDIATE;\n{enable}'
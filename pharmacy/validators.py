@@ -0,0 +1,59 @@
+from django.core.exceptions import ValidationError
+
+# ИНН и ОГРН хранятся числом (BigIntegerField). ИНН может начинаться с нуля
+# (код региона 01-09), поэтому для вывода и проверки число дополняется нулями.
+
+INN_10_WEIGHTS = (2, 4, 10, 3, 5, 9, 4, 6, 8)
+INN_11_WEIGHTS = (7, 2, 4, 10, 3, 5, 9, 4, 6, 8)
+INN_12_WEIGHTS = (3, 7, 2, 4, 10, 3, 5, 9, 4, 6, 8)
+
+
+def format_inn(value):
+    """
+    ИНН строкой: 10 цифр (организация) или 12 (физлицо / ИП), с ведущими нулями.
+    """
+    if value is None:
+        return ''
+    return f'{value:010d}' if value < 10 ** 10 else f'{value:012d}'
+
+
+def format_ogrn(value):
+    """
+    ОГРН (13 цифр) / ОГРНИП (15 цифр) строкой.
+    """
+    return '' if value is None else str(value)
+
+
+def _check_digit(digits, weights):
+    return sum(int(d) * w for d, w in zip(digits, weights)) % 11 % 10
+
+
+def validate_inn(value):
+    digits = format_inn(value)
+    if value < 10 ** 8:
+        # Дополнение нулями восстанавливает только одну ведущую цифру 0
+        # (регионы 01-09); "0000000018" - не ИНН, хотя контрольная цифра сходится
+        valid = False
+    elif len(digits) == 10:
+        valid = _check_digit(digits, INN_10_WEIGHTS) == int(digits[9])
+    elif len(digits) == 12:
+        valid = (
+            _check_digit(digits, INN_11_WEIGHTS) == int(digits[10])
+            and _check_digit(digits, INN_12_WEIGHTS) == int(digits[11])
+        )
+    else:
+        valid = False
+    if not valid:
+        raise ValidationError("Некорректный ИНН: %(value)s", params={'value': digits})
+
+
+def validate_ogrn(value):
+    digits = format_ogrn(value)
+    if len(digits) == 13:
+        valid = int(digits[:12]) % 11 % 10 == int(digits[12])
+    elif len(digits) == 15:
+        valid = int(digits[:14]) % 13 % 10 == int(digits[14])
+    else:
+        valid = False
+    if not valid:
+        raise ValidationError("Некорректный ОГРН: %(value)s", params={'value': digits})